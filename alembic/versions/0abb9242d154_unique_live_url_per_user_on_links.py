@@ -0,0 +1,49 @@
+"""unique live url per user on links
+
+Revision ID: 0abb9242d154
+Revises: 9f1595ec565d
+Create Date: 2026-10-15 07:11:12.614195
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0abb9242d154'
+down_revision: Union[str, None] = '9f1595ec565d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Mevcut tekrarlar: her (user_id, url) için en eski link kalır, diğerleri soft delete edilir
+    op.execute(
+        """
+        UPDATE links SET is_deleted = true
+        WHERE is_deleted = false AND id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (PARTITION BY user_id, url ORDER BY id) AS rn
+                FROM links WHERE is_deleted = false
+            ) ranked
+            WHERE ranked.rn > 1
+        )
+        """
+    )
+    op.drop_index('ix_links_user_url', table_name='links')
+    op.create_index(
+        'uq_links_user_url_live',
+        'links',
+        ['user_id', 'url'],
+        unique=True,
+        postgresql_where=sa.text('is_deleted = false'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_links_user_url_live', table_name='links')
+    op.create_index('ix_links_user_url', 'links', ['user_id', 'is_deleted', 'url'], unique=False)
@@ -0,0 +1,33 @@
+"""add is_admin to users
+
+Revision ID: 2c9d25849040
+Revises: 620e41cbada1
+Create Date: 2026-10-15 07:00:26.537829
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c9d25849040'
+down_revision: Union[str, None] = '620e41cbada1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'users',
+        sa.Column('is_admin', sa.Boolean(), server_default=sa.false(), nullable=False),
+    )
+    # Önceki davranışı koru: "admin" kullanıcı adı admin kabul ediliyordu
+    op.execute("UPDATE users SET is_admin = true WHERE username = 'admin'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'is_admin')
@@ -0,0 +1,32 @@
+"""drop redundant id indexes
+
+Revision ID: 5d3c8e2a91f7
+Revises: 0abb9242d154
+Create Date: 2026-10-15 07:24:38.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d3c8e2a91f7'
+down_revision: Union[str, None] = '0abb9242d154'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Primary key zaten kendi unique btree index'ine sahip; ix_<tablo>_id index'leri onun birebir kopyası
+_TABLES = ('users', 'platforms', 'links', 'refresh_tokens', 'social_accounts', 'user_page_settings')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in _TABLES:
+        op.drop_index(op.f(f'ix_{table}_id'), table_name=table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in _TABLES:
+        op.create_index(op.f(f'ix_{table}_id'), table, ['id'], unique=False)
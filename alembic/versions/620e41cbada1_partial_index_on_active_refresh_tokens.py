@@ -0,0 +1,34 @@
+"""partial index on active refresh tokens
+
+Revision ID: 620e41cbada1
+Revises: feea2ea4ab01
+Create Date: 2026-10-15 06:55:50.309224
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '620e41cbada1'
+down_revision: Union[str, None] = 'feea2ea4ab01'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_refresh_tokens_active',
+        'refresh_tokens',
+        ['user_id'],
+        unique=False,
+        postgresql_where=sa.text('is_revoked = false'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_refresh_tokens_active', table_name='refresh_tokens')
@@ -0,0 +1,46 @@
+"""store profile completion on users
+
+Revision ID: 8b4e1f6c2d90
+Revises: 5d3c8e2a91f7
+Create Date: 2026-10-15 08:10:12.914305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b4e1f6c2d90'
+down_revision: Union[str, None] = '5d3c8e2a91f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'users',
+        sa.Column('profile_completion', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    )
+    # Mevcut kullanıcılar için yüzdeyi tek bir UPDATE ile doldur (UserService._profile_completion ile aynı kural)
+    op.execute(
+        """
+        UPDATE users SET profile_completion = (
+            (CASE WHEN coalesce(display_name, '') <> '' THEN 1 ELSE 0 END)
+            + (CASE WHEN coalesce(bio, '') <> '' THEN 1 ELSE 0 END)
+            + (CASE WHEN coalesce(profile_image_url, '') <> '' THEN 1 ELSE 0 END)
+            + (CASE WHEN coalesce(website, '') <> '' THEN 1 ELSE 0 END)
+            + (CASE WHEN coalesce(twitter_username, '') <> '' OR coalesce(instagram_username, '') <> ''
+                    OR coalesce(linkedin_username, '') <> '' THEN 1 ELSE 0 END)
+            + (CASE WHEN coalesce(page_title, '') <> '' THEN 1 ELSE 0 END)
+            + (CASE WHEN coalesce(page_description, '') <> '' THEN 1 ELSE 0 END)
+        ) * 100 / 7
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'profile_completion')
@@ -0,0 +1,29 @@
+"""rename refresh token column to token_hash
+
+Revision ID: 9f1595ec565d
+Revises: b1778d00feae
+Create Date: 2026-10-15 07:07:14.977647
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f1595ec565d'
+down_revision: Union[str, None] = 'b1778d00feae'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('refresh_tokens', 'token', new_column_name='token_hash')
+    op.execute('ALTER INDEX ix_refresh_tokens_token RENAME TO ix_refresh_tokens_token_hash')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('ALTER INDEX ix_refresh_tokens_token_hash RENAME TO ix_refresh_tokens_token')
+    op.alter_column('refresh_tokens', 'token_hash', new_column_name='token')
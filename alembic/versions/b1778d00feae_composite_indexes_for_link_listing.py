@@ -0,0 +1,34 @@
+"""composite indexes for link listing
+
+Revision ID: b1778d00feae
+Revises: e4d11ed47188
+Create Date: 2026-10-15 07:06:03.875633
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1778d00feae'
+down_revision: Union[str, None] = 'e4d11ed47188'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_links_user_active_order',
+        'links',
+        ['user_id', 'is_deleted', 'is_active', 'order_index'],
+        unique=False,
+    )
+    op.create_index('ix_links_user_url', 'links', ['user_id', 'is_deleted', 'url'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_links_user_url', table_name='links')
+    op.drop_index('ix_links_user_active_order', table_name='links')
@@ -0,0 +1,40 @@
+"""trigram indexes for link search
+
+Revision ID: e4d11ed47188
+Revises: 2c9d25849040
+Create Date: 2026-10-15 07:05:39.570125
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4d11ed47188'
+down_revision: Union[str, None] = '2c9d25849040'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_TRGM_COLUMNS = ('title', 'description', 'url')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in _TRGM_COLUMNS:
+        op.create_index(
+            f'ix_links_{column}_trgm',
+            'links',
+            [column],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in _TRGM_COLUMNS:
+        op.drop_index(f'ix_links_{column}_trgm', table_name='links')
@@ -0,0 +1,45 @@
+"""hash refresh tokens
+
+Revision ID: feea2ea4ab01
+Revises: 676b770fc51c
+Create Date: 2026-10-15 06:52:56.823112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'feea2ea4ab01'
+down_revision: Union[str, None] = '676b770fc51c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Plain-text tokens cannot be converted to keyed hashes, so live sessions are dropped
+    op.execute("DELETE FROM refresh_tokens")
+    op.alter_column(
+        'refresh_tokens',
+        'token',
+        existing_type=sa.Text(),
+        type_=sa.LargeBinary(length=32),
+        existing_nullable=False,
+        postgresql_using='token::bytea',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM refresh_tokens")
+    op.alter_column(
+        'refresh_tokens',
+        'token',
+        existing_type=sa.LargeBinary(length=32),
+        type_=sa.Text(),
+        existing_nullable=False,
+        postgresql_using="encode(token, 'hex')",
+    )
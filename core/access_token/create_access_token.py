@@ -1,4 +1,5 @@
-from datetime import datetime, timedelta
+import time
+from datetime import timedelta
 import jwt
 
 SECRET_KEY = "gizli_anahtarın_ne_kadar_karmaşıksa_o_kadar_iyi"
@@ -7,6 +8,6 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
+    expire_seconds = (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)).total_seconds()
+    to_encode.update({"exp": int(time.time() + expire_seconds)})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
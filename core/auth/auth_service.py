@@ -1,12 +1,21 @@
-from datetime import datetime, timedelta
+import asyncio
+import base64
+import hashlib
+import json
+import secrets
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from functools import lru_cache
 from typing import Optional, Dict, Any, Tuple
-import uuid
 
+import bcrypt
 import jwt
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 from fastapi import HTTPException, status
-from passlib.context import CryptContext
 
-from core.exceptions import InvalidCredentialsException, UnauthorizedException
+from core.exceptions import AlreadyExistsException, InvalidCredentialsException, UnauthorizedException
 from models import User, RefreshToken
 from repositories.user.user_repository import UserRepository
 from repositories.auth.refresh_token_repository import RefreshTokenRepository
@@ -14,10 +23,30 @@ from services.user.user_service import UserService
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from services.user.user_service_dto import UserCreate
+from utils.time_utils import utcnow
+
+
+@lru_cache(maxsize=None)
+def _expected_jwt_header(algorithm: str) -> str:
+    """Base64url-encoded JOSE header PyJWT emits for tokens signed with `algorithm`, plus the separator"""
+    header = json.dumps({"alg": algorithm, "typ": "JWT"}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(header).rstrip(b"=").decode("ascii") + "."
 
 
 class AuthService:
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    # Bilinmeyen kullanıcılar için kullanılan sahte hash, hasher başına bir kez üretilir
+    _dummy_hashes: Dict[PasswordHasher, str] = {}
+    # Doğrulanmış access token'lar (token -> (exp, payload)); token süresi dolunca geçersiz olur.
+    # Sadece event loop thread'inden erişildiği için kilit gerekmez.
+    _token_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+    _token_cache_size: int = 10_000
+    # Başarısız giriş denemeleri ((email, parola özeti) -> son geçerlilik); aynı çiftin tekrarları
+    # hash doğrulaması yapılmadan reddedilir. Başarılı girişler asla önbelleğe alınmaz.
+    _failed_logins: "OrderedDict[Tuple[str, bytes], float]" = OrderedDict()
+    _failed_logins_size: int = 10_000
+    _failed_logins_ttl: float = 60.0
+    # Parola özetleri için süreç başına rastgele anahtar; önbellekte düz SHA-256 parola özeti tutulmaz
+    _failed_login_key: bytes = secrets.token_bytes(32)
 
     def __init__(
             self,
@@ -28,6 +57,7 @@ class AuthService:
             algorithm: str,
             expire_minutes: int,
             refresh_expire_days: int = 7,
+            password_hasher: Optional[PasswordHasher] = None,
             db_session: AsyncSession = None,
     ):
         self.user_service = user_service
@@ -36,43 +66,115 @@ class AuthService:
         self.secret_key = secret_key
         self.algorithm = algorithm
         self.expire_minutes = expire_minutes
+        # JWT encode/decode'da her çağrıda yeniden oluşturulmaması için önceden hazırlanır
+        self._signing_key = secret_key.encode("utf-8")
+        self._algorithms = [algorithm]
+        self._expected_header = _expected_jwt_header(algorithm)
+        self._expire_seconds = expire_minutes * 60
+        # Refresh token özetleri için secret key'den türetilen pepper
+        self._refresh_token_pepper = hashlib.blake2b(
+            self._signing_key, digest_size=32, person=b"refresh-token"
+        ).digest()
         self.refresh_expire_days = refresh_expire_days
+        self.password_hasher = password_hasher or PasswordHasher()
         self.db_session = db_session
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return self.pwd_context.verify(plain_password, hashed_password)
+        # Eski bcrypt hash'leri doğrulanmaya devam eder, ilk başarılı girişte Argon2id'ye yükseltilir
+        if hashed_password.startswith("$2"):
+            return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+        try:
+            return self.password_hasher.verify(hashed_password, plain_password)
+        except (VerificationError, InvalidHashError):
+            return False
 
     def hash_password(self, password: str) -> str:
-        return self.pwd_context.hash(password)
+        return self.password_hasher.hash(password)
+
+    def password_needs_rehash(self, hashed_password: str) -> bool:
+        """Whether a stored hash is legacy bcrypt or uses outdated Argon2 parameters"""
+        return hashed_password.startswith("$2") or self.password_hasher.check_needs_rehash(hashed_password)
+
+    def _verify_dummy_password(self, plain_password: str) -> bool:
+        """Run a verify against a dummy hash so unknown users cost the same as wrong passwords"""
+        dummy_hash = self._dummy_hashes.get(self.password_hasher)
+        if dummy_hash is None:
+            dummy_hash = self._dummy_hashes[self.password_hasher] = self.hash_password("!invalid!")
+        self.verify_password(plain_password, dummy_hash)
+        return False
+
+    def _failed_login_cache_key(self, email: str, password: str) -> Tuple[str, bytes]:
+        return email, hashlib.blake2b(
+            password.encode("utf-8"), key=self._failed_login_key, digest_size=16
+        ).digest()
+
+    def _remember_failed_login(self, cache_key: Tuple[str, bytes]) -> None:
+        self._failed_logins[cache_key] = time.monotonic() + self._failed_logins_ttl
+        self._failed_logins.move_to_end(cache_key)
+        if len(self._failed_logins) > self._failed_logins_size:
+            self._failed_logins.popitem(last=False)
+
+    @classmethod
+    def forget_failed_logins(cls, email: str) -> None:
+        """Drop cached failures for an email (e.g. once an account is registered under it)"""
+        for cache_key in [key for key in cls._failed_logins if key[0] == email]:
+            del cls._failed_logins[cache_key]
 
     async def authenticate_user(self, email: str, password: str) -> Optional[User]:
         """Authenticate a user by username and password"""
+        # Aynı (email, parola) çifti yakın zamanda başarısız olduysa hash doğrulamasını tekrar çalıştırma
+        cache_key = self._failed_login_cache_key(email, password)
+        expires_at = self._failed_logins.get(cache_key)
+        if expires_at is not None:
+            if expires_at > time.monotonic():
+                raise InvalidCredentialsException()
+            del self._failed_logins[cache_key]
+
         user = await self.user_service.get_by_email(email)
-        if not user or not self.verify_password(password, user.hashed_password):
-            raise InvalidCredentialsException
+        if user is None:
+            # Kullanıcı yoksa da hash doğrulaması çalıştır, aksi halde yanıt süresi hesabın varlığını sızdırır
+            await asyncio.to_thread(self._verify_dummy_password, password)
+            self._remember_failed_login(cache_key)
+            raise InvalidCredentialsException()
+        if not await asyncio.to_thread(self.verify_password, password, user.hashed_password):
+            self._remember_failed_login(cache_key)
+            raise InvalidCredentialsException()
+
+        # Upgrade legacy/outdated hashes while the plain password is at hand
+        if self.password_needs_rehash(user.hashed_password):
+            user.hashed_password = await asyncio.to_thread(self.hash_password, password)
+            await self.user_service.update_user(user)
         return user
 
     def create_access_token(self, data: Dict[str, Any]) -> str:
         """Create a JWT access token with expiration time"""
         to_encode = data.copy()
-        expire = datetime.utcnow() + timedelta(minutes=self.expire_minutes)
-        to_encode.update({"exp": expire})
+        to_encode["exp"] = int(time.time()) + self._expire_seconds
 
         # Ensure we have a subject claim
         if "sub" not in to_encode:
             raise ValueError("Token data must contain 'sub' field")
 
-        return jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
+        return jwt.encode(to_encode, self._signing_key, algorithm=self.algorithm)
 
     async def verify_token(self, token: str) -> Dict[str, Any]:
         """Verify and decode a JWT token"""
+        cached = self._token_cache.get(token)
+        if cached is not None:
+            if cached[0] > time.time():
+                self._token_cache.move_to_end(token)
+                return cached[1]
+            del self._token_cache[token]
+
         try:
+            # Reject malformed tokens before spending an HMAC on them
+            if token.count(".") != 2 or not token.startswith(self._expected_header):
+                raise jwt.DecodeError("Unexpected token format")
             payload = jwt.decode(
                 token,
-                self.secret_key,
-                algorithms=[self.algorithm]
+                self._signing_key,
+                algorithms=self._algorithms
             )
-            return payload
         except jwt.PyJWTError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -80,10 +182,22 @@ class AuthService:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
+        if "exp" in payload:
+            self._token_cache[token] = (payload["exp"], payload)
+            if len(self._token_cache) > self._token_cache_size:
+                self._token_cache.popitem(last=False)
+        return payload
+
+    def _hash_refresh_token(self, refresh_token_value: str) -> bytes:
+        """Keyed blake2b digest of a refresh token; only the digest is stored in the database"""
+        return hashlib.blake2b(
+            refresh_token_value.encode("utf-8"), key=self._refresh_token_pepper, digest_size=32
+        ).digest()
+
     async def register_user(self, user_in = UserCreate) -> User:
         """Register a new user with hashed password"""
-        # Create user with hashed password
-        hashed_password = self.hash_password(user_in.password)
+        # Hash in a worker thread so Argon2 doesn't block the event loop
+        hashed_password = await asyncio.to_thread(self.hash_password, user_in.password)
 
         # Create a User object instead of passing individual parameters
         new_user = User(
@@ -92,8 +206,17 @@ class AuthService:
             hashed_password=hashed_password
         )
 
-        # Pass the User object to create_user
-        return await self.user_service.create_user(new_user)
+        # Existence check and insert happen in a single INSERT ... ON CONFLICT DO NOTHING
+        user = await self.user_repository.insert_if_absent(new_user)
+        if user is None:
+            # Only the failure path pays for a second query to report which field clashed
+            if await self.user_repository.username_exists(new_user.username):
+                raise AlreadyExistsException(detail=f"This username already exists: {user_in.username}")
+            raise AlreadyExistsException(detail=f"This email already exists: {user_in.email}")
+
+        # Kayıttan önce bu email ile yapılmış başarısız denemeler artık geçerli değil
+        self.forget_failed_logins(user.email)
+        return user
 
     async def create_tokens(self, user: User) -> Tuple[str, str]:
         """Kullanıcı için access token ve refresh token oluşturur"""
@@ -101,12 +224,12 @@ class AuthService:
         access_token = self.create_access_token({"sub": user.username})
 
         # Refresh token oluştur
-        refresh_token_value = str(uuid.uuid4())
-        expires_at = datetime.utcnow() + timedelta(days=self.refresh_expire_days)
+        refresh_token_value = secrets.token_urlsafe(32)
+        expires_at = utcnow() + timedelta(days=self.refresh_expire_days)
 
-        # Refresh token veritabanına kaydet
+        # Refresh token'ın sadece özetini veritabanına kaydet
         refresh_token = RefreshToken(
-            token=refresh_token_value,
+            token_hash=self._hash_refresh_token(refresh_token_value),
             user_id=user.id,
             expires_at=expires_at,
             is_revoked=False
@@ -118,29 +241,26 @@ class AuthService:
 
     async def refresh_access_token(self, refresh_token_value: str) -> str:
         """Refresh token kullanarak yeni bir access token oluşturur"""
-        # Refresh token'ı veritabanında bul
-        refresh_token = await self.refresh_token_repository.get_valid_token(refresh_token_value)
+        # Refresh token'ı ve kullanıcıyı tek sorguda bul
+        token_with_user = await self.refresh_token_repository.get_valid_token_with_user(
+            self._hash_refresh_token(refresh_token_value)
+        )
 
-        if not refresh_token:
+        if not token_with_user:
             raise UnauthorizedException(detail="Invalid or expired refresh token")
 
-        # Kullanıcıyı bul
-        user = await self.user_repository.get_by_id(refresh_token.user_id)
-        if not user:
-            raise UnauthorizedException(detail="User not found")
+        _, user = token_with_user
 
         # Yeni access token oluştur
         access_token = self.create_access_token({"sub": user.username})
 
         return access_token
 
-    async def revoke_refresh_token(self, refresh_token_value: str) -> None:
-        """Refresh token'ı geçersiz kılar (logout işlemi için)"""
-        await self.refresh_token_repository.revoke_token(refresh_token_value)
-        return None
+    async def revoke_refresh_token(self, refresh_token_value: str) -> bool:
+        """Refresh token'ı geçersiz kılar (logout işlemi için); aktif bir token bulunduysa True döner"""
+        return await self.refresh_token_repository.revoke_token(self._hash_refresh_token(refresh_token_value))
 
-    async def revoke_all_user_tokens(self, user_id: int) -> None:
-        """Kullanıcının tüm refresh token'larını geçersiz kılar (şifre değişikliği, vb.)"""
-        await self.refresh_token_repository.revoke_all_user_tokens(user_id)
-        return None
+    async def revoke_all_user_tokens(self, user_id: int) -> int:
+        """Kullanıcının tüm refresh token'larını geçersiz kılar (şifre değişikliği, vb.); revoke edilen sayıyı döner"""
+        return len(await self.refresh_token_repository.revoke_all_user_tokens(user_id))
 
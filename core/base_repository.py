@@ -1,13 +1,34 @@
-from typing import Any, Callable, Generic, Sequence, Type, TypeVar, Optional, Awaitable
+from typing import Any, AsyncIterator, Callable, Generic, Sequence, Type, TypeVar, Optional, Awaitable
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from db import run_in_transaction, execute_without_transaction
+from db import run_in_transaction, execute_without_transaction, get_request_session, get_session_factory
 
 T = TypeVar('T')
 
 
+# Query functions are defined once at module level instead of as per-call closures
+
+async def _add(session: AsyncSession, entity: T) -> T:
+    session.add(entity)
+    await session.flush()
+    return entity
+
+
+async def _delete(session: AsyncSession, entity: T) -> None:
+    await session.delete(entity)
+
+
+async def _list_all(session: AsyncSession, model_type: Type[T]) -> Sequence[T]:
+    result = await session.execute(select(model_type))
+    return result.scalars().all()
+
+
+async def _get_by_id(session: AsyncSession, model_type: Type[T], id_value: Any) -> Optional[T]:
+    return await session.get(model_type, id_value)
+
+
 class BaseRepository(Generic[T]):
     def __init__(self, session_factory: Callable[[], AsyncSession]):
         self._session_factory = session_factory
@@ -15,46 +36,58 @@ class BaseRepository(Generic[T]):
 
     # Transactional operations (with auto commit/rollback)
     async def create(self, entity: T) -> T:
-        async def _create(session: AsyncSession, entity_: T) -> T:
-            session.add(entity_)
-            await session.flush()
-            return entity_
-
-        return await run_in_transaction(_create, entity)
+        return await run_in_transaction(_add, entity)
 
     async def update(self, entity: T) -> T:
-        async def _update(session: AsyncSession, entity_: T) -> T:
-            session.add(entity_)
-            await session.flush()
-            return entity_
-
-        return await run_in_transaction(_update, entity)
+        return await run_in_transaction(_add, entity)
 
     async def delete(self, entity: T) -> None:
-        async def _delete(session: AsyncSession, entity_: T) -> None:
-            await session.delete(entity_)
-
         await run_in_transaction(_delete, entity)
 
     # Non-transactional read operations (no auto commit)
 
     async def list_all(self, transactional: bool = False) -> Sequence[T]:
-        async def _list_all(session: AsyncSession) -> Sequence[T]:
-            result = await session.execute(select(self._model_type))
-            return result.scalars().all()
-
         if transactional:
-            return await run_in_transaction(_list_all)
+            return await run_in_transaction(_list_all, self._model_type)
         else:
-            return await execute_without_transaction(_list_all)
+            return await execute_without_transaction(_list_all, self._model_type)
+
+    async def iter_all(self, batch_size: int = 1000) -> AsyncIterator[T]:
+        """
+        Stream all entities through a server-side cursor, fetching `batch_size` rows at a time.
+        Use this for exports/large tables; list_all stays the eager API for small ones.
+        """
+        query = select(self._model_type).execution_options(yield_per=batch_size)
+        async for entity in self.stream_scalars(query):
+            yield entity
+
+    async def stream_scalars(self, query: Any) -> AsyncIterator[Any]:
+        """
+        Stream the scalar results of `query` through a server-side cursor.
+        Uses the request session while it is open, otherwise (e.g. when a streaming
+        response is consumed after the request dependencies have exited) a short-lived one.
+        """
+        session = get_request_session()
+        if session is not None:
+            async for entity in await session.stream_scalars(query):
+                yield entity
+            return
+
+        async with get_session_factory()() as session:
+            async for entity in await session.stream_scalars(query):
+                yield entity
 
     async def get_by_id(self, id_: Any, transactional: bool = False) -> Optional[T]:
-        async def _get_by_id(session: AsyncSession, id_value: Any) -> Optional[T]:
-            return await session.get(self._model_type, id_value)
+        """
+        Get an entity by primary key.
 
+        Uses session.get, so within a request-scoped session an entity that is
+        already loaded (e.g. the authenticated user) is served from the identity
+        map without another SELECT.
+        """
         if transactional:
-            return await run_in_transaction(_get_by_id, id_)
-        return await execute_without_transaction(_get_by_id, id_)
+            return await run_in_transaction(_get_by_id, self._model_type, id_)
+        return await execute_without_transaction(_get_by_id, self._model_type, id_)
 
     # Helper methods for custom queries
     async def execute_query(
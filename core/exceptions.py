@@ -1,6 +1,9 @@
+import logging
 from typing import Any, Dict, List, Optional
 from fastapi import HTTPException, status
 
+logger = logging.getLogger(__name__)
+
 
 class BaseAppException(HTTPException):
     """
@@ -9,6 +12,8 @@ class BaseAppException(HTTPException):
     status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR
     detail: str = "Unknown error occurred."
     headers: Optional[Dict[str, Any]] = None
+    # Whether extra info should always be merged into the detail string (otherwise only in DEBUG)
+    include_extra_in_detail: bool = False
 
     def __init__(
         self,
@@ -27,8 +32,13 @@ class BaseAppException(HTTPException):
         # If detail is provided, use it instead of the class default value
         actual_detail = detail if detail is not None else self.detail
 
-        # If there is additional info and detail is a string, enrich the detail
-        if self.extra_info and isinstance(actual_detail, str):
+        # Enrich the detail with additional info only when explicitly requested or debugging,
+        # the extra info stays available separately on `extra_info`
+        if (
+            self.extra_info
+            and isinstance(actual_detail, str)
+            and (self.include_extra_in_detail or logger.isEnabledFor(logging.DEBUG))
+        ):
             actual_detail = (f"{actual_detail} Extra info: {self.extra_info}")
 
         # If headers are provided, use them instead of the class default value
@@ -156,4 +166,3 @@ class UnauthorizedException(BaseAppException):
     status_code = status.HTTP_401_UNAUTHORIZED
     detail = "Unauthorized access"
     headers = {"WWW-Authenticate": "Bearer"}
-
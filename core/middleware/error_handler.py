@@ -1,81 +1,163 @@
 import logging
-import traceback
-from typing import Callable
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
 
-from fastapi import FastAPI, Request, status
-from fastapi.responses import JSONResponse
+import orjson
+from fastapi import FastAPI, Request, Response, status
 from sqlalchemy.exc import SQLAlchemyError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from core.exceptions import BaseAppException, DatabaseException
-from core.schemas.response import ErrorResponse
+from core.schemas.response import STATUS_ERROR
 
 logger = logging.getLogger(__name__)
 
 
-async def catch_exceptions_middleware(request: Request, call_next: Callable):
+class ExceptionASGIMiddleware:
     """
     Global exception catching middleware.
-    Catches application-wide exceptions and converts them to appropriate HTTP responses.
+    Converts application and database exceptions to appropriate HTTP responses.
+    Anything else propagates to Starlette's ServerErrorMiddleware, which logs it and
+    answers with the generic 500 handler registered in setup_exception_handlers.
+
+    Implemented as a pure ASGI middleware, so the pass-through path costs a single
+    await instead of BaseHTTPMiddleware's per-request streams and task groups.
     """
-    try:
-        return await call_next(request)
-    except BaseAppException as exc:
-        # If it's an exception we've defined, use it directly
-        logger.warning(
-            f"Handled error: {exc.__class__.__name__}. Details: {exc.detail}"
-        )
-        error_response = ErrorResponse.create(message=exc.detail)
-        return JSONResponse(
-            status_code=exc.status_code,
-            content=error_response.dict(),
-            headers=exc.headers,
-        )
-    except SQLAlchemyError as exc:
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except (BaseAppException, SQLAlchemyError) as exc:
+            # Once the response has started we can't replace it, let the server handle it
+            if response_started:
+                raise
+            status_code, body, headers = self._build_error(exc)
+            await _send_body(send, status_code, body, headers)
+
+    @staticmethod
+    def _build_error(exc: Exception) -> Tuple[int, bytes, Optional[Dict[str, str]]]:
+        """Status code, serialized ErrorResponse body and headers for an exception"""
+        if isinstance(exc, BaseAppException):
+            # If it's an exception we've defined, use it directly
+            logger.warning(
+                "Handled error: %s. Details: %s Extra info: %s",
+                exc.__class__.__name__, exc.detail, exc.extra_info,
+            )
+            validation_errors = exc.extra_info.get("validation_errors")
+            if validation_errors:
+                content = _error_content(exc.detail)
+                content["errors"] = validation_errors
+                return exc.status_code, orjson.dumps(content), exc.headers
+            # detail çoğunlukla istek verisi içerir (id, kullanıcı adı), bu yüzden önbelleğe alınmaz
+            return exc.status_code, orjson.dumps(_error_content(exc.detail)), exc.headers
+
         # Special handling for database errors
-        logger.error(f"Database error: {str(exc)}")
-        logger.debug(traceback.format_exc())
-        db_exception = DatabaseException(detail=f"Database error: {str(exc)}")
-        error_response = ErrorResponse.create(message="A database error occurred. Please try again later.")
-        return JSONResponse(
-            status_code=db_exception.status_code,
-            content=error_response.dict(),
-        )
-    except Exception as exc:
-        # For undefined error situations
-        error_detail = f"Unexpected error: {str(exc)}"
-        logger.error(error_detail)
-        logger.debug(traceback.format_exc())
-
-        error_response = ErrorResponse.create(message=error_detail)
-        return JSONResponse(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            content=error_response.dict(),
+        logger.error("Database error: %s", exc)
+        logger.debug("Database error traceback", exc_info=exc)
+        body = error_response_body("A database error occurred. Please try again later.")
+        return DatabaseException.status_code, body, None
+
+
+def _error_content(message: str) -> Dict[str, Any]:
+    """ErrorResponse payload as a plain dict, skipping model construction on the error path"""
+    return {"status": STATUS_ERROR, "message": message, "data": None}
+
+
+@lru_cache(maxsize=1024)
+def error_response_body(message: str) -> bytes:
+    """
+    Serialized ErrorResponse envelope for a static message, encoded only once.
+    Only pass fixed strings: messages containing request data (paths, ids, usernames) would fill the cache.
+    """
+    return orjson.dumps(_error_content(message))
+
+
+@lru_cache(maxsize=2048)
+def _not_found_body(path: str) -> bytes:
+    """
+    404 body for a path. Kept in its own cache so scanners probing many paths
+    can't evict the static messages cached by error_response_body.
+    """
+    return orjson.dumps(_error_content(f"Requested resource not found: {path}"))
+
+
+def error_json_response(
+        status_code: int,
+        message: str,
+        headers: Optional[Dict[str, str]] = None,
+        cached: bool = True,
+) -> Response:
+    """
+    Error response built from the cached, pre-serialized envelope.
+    Pass cached=False for messages that contain request data.
+    """
+    return Response(
+        content=error_response_body(message) if cached else orjson.dumps(_error_content(message)),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+
+async def _send_body(
+        send: Send,
+        status_code: int,
+        body: bytes,
+        headers: Optional[Dict[str, str]] = None,
+) -> None:
+    """Send a complete, already serialized JSON response directly over ASGI"""
+    raw_headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode("latin-1")),
+    ]
+    if headers:
+        raw_headers.extend(
+            (key.lower().encode("latin-1"), value.encode("latin-1")) for key, value in headers.items()
         )
+    await send({"type": "http.response.start", "status": status_code, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": body})
 
 
 def setup_exception_handlers(app: FastAPI) -> None:
     """
     Adds exception handlers to the FastAPI application.
     """
-    app.middleware("http")(catch_exceptions_middleware)
-
     # Special handlers for specific status codes
     @app.exception_handler(status.HTTP_404_NOT_FOUND)
-    async def not_found_handler(request: Request, exc) -> JSONResponse:
-        error_response = ErrorResponse.create(
-            message=f"Requested resource not found: {request.url.path}"
-        )
-        return JSONResponse(
+    async def not_found_handler(request: Request, exc) -> Response:
+        return Response(
+            content=_not_found_body(request.url.path),
             status_code=status.HTTP_404_NOT_FOUND,
-            content=error_response.dict()
+            media_type="application/json",
         )
 
-    @app.exception_handler(status.HTTP_405_METHOD_NOT_ALLOWED)
-    async def method_not_allowed_handler(request: Request, exc) -> JSONResponse:
-        error_response = ErrorResponse.create(
-            message=f"Method '{request.method}' not allowed for the requested resource: {request.url.path}"
+    # Used by ServerErrorMiddleware for unhandled exceptions; the exception detail is never exposed
+    @app.exception_handler(status.HTTP_500_INTERNAL_SERVER_ERROR)
+    async def internal_error_handler(request: Request, exc: Exception) -> Response:
+        return error_json_response(
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+            "An unexpected error occurred.",
         )
-        return JSONResponse(
-            status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
-            content=error_response.dict()
+
+    @app.exception_handler(status.HTTP_405_METHOD_NOT_ALLOWED)
+    async def method_not_allowed_handler(request: Request, exc) -> Response:
+        return error_json_response(
+            status.HTTP_405_METHOD_NOT_ALLOWED,
+            f"Method '{request.method}' not allowed for the requested resource: {request.url.path}",
+            cached=False,
         )
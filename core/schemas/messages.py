@@ -0,0 +1,22 @@
+# Endpoint'lerin sabit yanıt mesajları; her istekte yeni string kurulmaz
+
+# Links
+MSG_LINK_CREATED = "Link successfully created"
+MSG_LINKS_RETRIEVED = "Links retrieved successfully"
+MSG_LINK_RETRIEVED = "Link retrieved successfully"
+MSG_LINK_UPDATED = "Link successfully updated"
+MSG_LINKS_REORDERED = "Links reordered successfully"
+MSG_LINK_TOGGLED = "Link status toggled successfully"
+MSG_ANALYTICS_RETRIEVED = "Analytics retrieved successfully"
+MSG_CLICK_RECORDED = "Click recorded successfully"
+
+# Profile
+MSG_PROFILE_RETRIEVED = "Profile retrieved successfully"
+MSG_ONBOARDING_STATUS_RETRIEVED = "Onboarding status retrieved"
+MSG_PROFILE_STEP_1_COMPLETED = "Profile step 1 completed successfully"
+MSG_PROFILE_STEP_2_COMPLETED = "Profile step 2 completed successfully"
+MSG_PROFILE_STEP_3_COMPLETED = "Profile step 3 completed successfully"
+MSG_PROFILE_STEP_4_COMPLETED = "Profile step 4 completed successfully"
+MSG_ONBOARDING_COMPLETED = "Onboarding completed successfully! Welcome to LinkYoSelf!"
+MSG_PROFILE_UPDATED = "Profile updated successfully"
+MSG_ONBOARDING_SKIPPED = "Onboarding skipped. You can complete your profile later!"
@@ -1,5 +1,4 @@
-from enum import Enum
-from typing import Any, Generic, List, Optional, TypeVar, Dict, Union
+from typing import Any, Generic, List, Literal, Optional, TypeVar, Dict, Union
 
 from pydantic import BaseModel, Field
 
@@ -7,12 +6,13 @@ from pydantic import BaseModel, Field
 T = TypeVar('T')
 
 
-class ResponseStatus(str, Enum):
-    """API yanıtı için durum enumu"""
-    SUCCESS = "success"
-    ERROR = "error"
-    WARNING = "warning"
-    INFO = "info"
+# API yanıtı için durum tipi; Enum yerine Literal, doğrulama ve serileştirmede üye çözümlemesi yapılmaz
+ResponseStatus = Literal["success", "error", "warning", "info"]
+
+STATUS_SUCCESS: ResponseStatus = "success"
+STATUS_ERROR: ResponseStatus = "error"
+STATUS_WARNING: ResponseStatus = "warning"
+STATUS_INFO: ResponseStatus = "info"
 
 
 class BaseResponseModel(BaseModel, Generic[T]):
@@ -24,7 +24,7 @@ class BaseResponseModel(BaseModel, Generic[T]):
         message: İsteğe bağlı açıklayıcı mesaj
         data: İsteğe bağlı yanıt verisi
     """
-    status: ResponseStatus = Field(default=ResponseStatus.SUCCESS)
+    status: ResponseStatus = Field(default=STATUS_SUCCESS)
     message: Optional[str] = Field(default=None, description="İsteğe bağlı açıklayıcı mesaj")
     data: Optional[T] = Field(default=None, description="Yanıt verisi")
 
@@ -50,7 +50,7 @@ class ErrorResponseModel(BaseResponseModel):
     Ek Özellikler:
         errors: Doğrulama hatalarının ayrıntılı listesi
     """
-    status: ResponseStatus = Field(default=ResponseStatus.ERROR)
+    status: ResponseStatus = Field(default=STATUS_ERROR)
     errors: Optional[List[Dict[str, Any]]] = Field(
         default=None,
         description="Doğrulama hataları listesi"
@@ -59,13 +59,14 @@ class ErrorResponseModel(BaseResponseModel):
 
 class SuccessResponse(BaseResponseModel[T]):
     """Başarılı yanıt için yardımcı sınıf"""
-    status: ResponseStatus = Field(default=ResponseStatus.SUCCESS)
+    status: ResponseStatus = Field(default=STATUS_SUCCESS)
 
     @classmethod
     def create(cls, data: T = None, message: str = None) -> "SuccessResponse":
         """Başarılı bir yanıt oluşturur"""
-        return cls(
-            status=ResponseStatus.SUCCESS,
+        # Veri sunucu tarafından üretildiği için doğrulama atlanır
+        return cls.model_construct(
+            status=STATUS_SUCCESS,
             message=message,
             data=data
         )
@@ -73,7 +74,7 @@ class SuccessResponse(BaseResponseModel[T]):
 
 class ErrorResponse(BaseResponseModel):
     """Hata yanıtı için yardımcı sınıf"""
-    status: ResponseStatus = Field(default=ResponseStatus.ERROR)
+    status: ResponseStatus = Field(default=STATUS_ERROR)
 
     @classmethod
     def create(
@@ -84,14 +85,14 @@ class ErrorResponse(BaseResponseModel):
     ) -> Union["ErrorResponse", "ErrorResponseModel"]:
         """Hata yanıtı oluşturur"""
         if errors:
-            return ErrorResponseModel(
-                status=ResponseStatus.ERROR,
+            return ErrorResponseModel.model_construct(
+                status=STATUS_ERROR,
                 message=message,
                 data=data,
                 errors=errors
             )
-        return cls(
-            status=ResponseStatus.ERROR,
+        return cls.model_construct(
+            status=STATUS_ERROR,
             message=message,
             data=data
         )
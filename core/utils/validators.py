@@ -0,0 +1,7 @@
+# Hex renk kodlarında izin verilen karakterler
+_HEX_DIGITS = frozenset('0123456789abcdefABCDEF')
+
+
+def is_hex_color(color: str) -> bool:
+    """#RRGGBB formatında hex renk kodu mu (regex ve int(..., 16) yok; int() '0x' önekini de kabul ederdi)"""
+    return len(color) == 7 and color[0] == '#' and _HEX_DIGITS.issuperset(color[1:])
@@ -1,4 +1,5 @@
-from typing import AsyncGenerator, Callable, TypeVar
+from contextvars import ContextVar
+from typing import AsyncGenerator, Callable, Optional, TypeVar
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
@@ -7,9 +8,18 @@ T = TypeVar('T')
 # Will hold the reference to the container's session factory
 _session_factory = None
 
+# Session shared by every repository call made while handling the current request
+_request_session: ContextVar[Optional[AsyncSession]] = ContextVar("request_session", default=None)
+
+# session.info key set by run_in_transaction once the request session has flushed writes
+_HAS_WRITES = "has_writes"
+
 def set_session_factory(factory):
     """Set the session factory to be used globally"""
     global _session_factory
+    # Validated once here, so the per-session hot paths below read the global without a check
+    if factory is None:
+        raise RuntimeError("Session factory not initialized")
     _session_factory = factory
 
 def get_session_factory() -> async_sessionmaker:
@@ -18,24 +28,44 @@ def get_session_factory() -> async_sessionmaker:
         raise RuntimeError("Session factory not initialized")
     return _session_factory
 
+def get_request_session() -> Optional[AsyncSession]:
+    """Get the session bound to the current request, if any"""
+    return _request_session.get()
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Provides a database session as an async generator with automatic transaction management.
+    Provides a request-scoped database session (unit of work) as an async generator.
+    Repositories pick it up through run_in_transaction/execute_without_transaction,
+    so the whole request runs in one transaction that is committed once at the end,
+    and only if something was written.
     """
-    factory = get_session_factory()
+    factory = _session_factory
     async with factory() as session:
+        token = _request_session.set(session)
         try:
             yield session
-            await session.commit()
+            # Read-only requests skip the COMMIT round-trip; closing the session rolls back
+            if session.info.get(_HAS_WRITES) or session.new or session.dirty or session.deleted:
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
+        finally:
+            _request_session.reset(token)
 
 async def run_in_transaction(func: Callable[..., T], *args, **kwargs) -> T:
     """
     Executes the given function within a transaction.
+    Inside a request the shared session is only flushed; get_db commits it at the end.
     """
-    factory = get_session_factory()
+    session = _request_session.get()
+    if session is not None:
+        result = await func(session, *args, **kwargs)
+        await session.flush()
+        session.info[_HAS_WRITES] = True
+        return result
+
+    factory = _session_factory
     async with factory() as session:
         try:
             result = await func(session, *args, **kwargs)
@@ -49,7 +79,10 @@ async def execute_without_transaction(func: Callable[..., T], *args, **kwargs) -
     """
     Executes the given function with a session but without automatic transaction management.
     """
-    factory = get_session_factory()
+    session = _request_session.get()
+    if session is not None:
+        return await func(session, *args, **kwargs)
+
+    factory = _session_factory
     async with factory() as session:
-        session.expire_on_commit = False
         return await func(session, *args, **kwargs)
\ No newline at end of file
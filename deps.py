@@ -1,10 +1,10 @@
-from dependency_injector.wiring import Provide, inject
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 
 from core.auth.auth_service import AuthService
-from di.container import Container
 from models import User
+from services.link.link_service import LinkService
+from services.user.user_service import UserIdentity, UserService
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='/auth/token')
 credentials_exception = HTTPException(
@@ -13,59 +13,82 @@ credentials_exception = HTTPException(
     headers={'WWW-Authenticate': 'Bearer'}
 )
 
+# Hata yanıtlarının sabit parçaları. Exception'lar her seferinde yeni oluşturulur: paylaşılan bir örnek her raise'de
+# traceback'ini (ve get_current_user'ın token içeren frame'ini) bir sonraki hataya kadar tutar.
+_BEARER_HEADERS = {"WWW-Authenticate": "Bearer"}
+
+
+def _invalid_auth() -> HTTPException:
+    return HTTPException(status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials",
+                         headers=_BEARER_HEADERS)
+
+
+# Servis bağımlılıkları uygulamanın container'ından çözülür (wiring/@inject yok).
+# FastAPI bağımlılık önbelleği sayesinde aynı istek içinde her servis bir kez oluşturulur.
+async def get_auth_service(request: Request) -> AuthService:
+    return request.app.container.auth_service()
+
+
+async def get_user_service(request: Request) -> UserService:
+    return request.app.container.user_service()
+
+
+async def get_link_service(request: Request) -> LinkService:
+    return request.app.container.link_service()
+
+
+async def _token_username(token: str, auth_service: AuthService) -> str:
+    # Verify and decode the token
+    try:
+        payload = await auth_service.verify_token(token)
+        username: str = payload.get("sub")
+    except Exception:
+        raise _invalid_auth() from None
+    if username is None:
+        raise _invalid_auth()
+    return username
+
+
+async def get_current_identity(
+        token: str = Depends(oauth2_scheme),
+        auth_service: AuthService = Depends(get_auth_service)
+) -> UserIdentity:
+    """
+    Authenticated user's id/username/is_admin, cached for a short TTL.
+    For endpoints that only need the user id; profile columns are not included.
+    """
+    identity = await auth_service.user_service.get_identity_cached(await _token_username(token, auth_service))
+    if identity is None:
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="User not found", headers=_BEARER_HEADERS)
+    return identity
+
 
-@inject
 async def get_current_user(
         token: str = Depends(oauth2_scheme),
-        auth_service: AuthService = Depends(Provide[Container.auth_service])
+        auth_service: AuthService = Depends(get_auth_service)
 ) -> User:
     """
     Get the current authenticated user based on the JWT token.
     Raises HTTPException if token is invalid or user doesn't exist.
     """
-    # Verify and decode the token
-    try:
-        payload = await auth_service.verify_token(token)
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    username = await _token_username(token, auth_service)
 
-    # Get the user from the database
+    # Profil kolonları önbellekten değil her istekte veritabanından okunur (diğer worker'ların güncellemeleri görünür)
     user = await auth_service.user_service.get_by_username(username)
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, detail="User not found", headers=_BEARER_HEADERS)
 
     # Return the authenticated user
     return user
 
 
-async def get_current_admin_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_admin_user(current_user: UserIdentity = Depends(get_current_identity)) -> UserIdentity:
     """
     Check if the current user is an admin.
     First authenticates the user, then checks if they have admin privileges.
     If not, raises a 403 Forbidden error.
     """
-    # Burada admin kontrolü yapılıyor
-    # Model yapınıza göre is_admin, role veya user_type gibi bir alan ekleyebilirsiniz
-    # Şu an için username === "admin" ise admin olarak kabul ediyoruz
-    if current_user.username != "admin":  # Bu koşulu modeldeki uygun alana göre değiştirin
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Admin privileges required",
-        )
+    # Admin yetkisi User.is_admin kolonundan okunur
+    if not current_user.is_admin:
+        raise HTTPException(status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
     return current_user
-
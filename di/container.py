@@ -1,5 +1,10 @@
+from functools import lru_cache
+from uuid import uuid4
+
+from argon2 import PasswordHasher
 from dependency_injector import containers, providers
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from core.auth.auth_service import AuthService
 from repositories.user.user_repository import UserRepository
@@ -10,35 +15,105 @@ from services.link.link_service import LinkService  # EKLENDI
 from settings import settings
 
 
-class Container(containers.DeclarativeContainer):
-    wiring_config = containers.WiringConfiguration(
-        packages=["routers", "core.auth"]
+def _prepared_statement_name() -> str:
+    """Her prepared statement için tekil isim; PgBouncer arkasında farklı istemcilerin isimleri çakışmaz"""
+    return f"__asyncpg_{uuid4()}__"
+
+
+# Transaction modundaki PgBouncer statement'lar arasında sunucu bağlantısını değiştirebilir; asyncpg ve
+# SQLAlchemy adaptörünün prepared statement cache'leri kapatılır, isimler tekil üretilir
+_PGBOUNCER_CONNECT_ARGS = {
+    "statement_cache_size": 0,
+    "prepared_statement_cache_size": 0,
+    "prepared_statement_name_func": _prepared_statement_name,
+}
+
+
+@lru_cache(maxsize=1)
+def _build_engine(
+        database_url: str,
+        echo: bool,
+        pool_size: int,
+        max_overflow: int,
+        pool_recycle: int,
+        pgbouncer: bool,
+        insertmanyvalues_page_size: int,
+) -> AsyncEngine:
+    """Process-wide engine; containers created later (reloads, scripts) reuse the same pool"""
+    if pgbouncer:
+        # PgBouncer zaten havuzluyor, uygulama tarafında ikinci bir havuz tutulmaz
+        return create_async_engine(
+            database_url,
+            echo=echo,
+            future=True,
+            poolclass=NullPool,
+            connect_args=_PGBOUNCER_CONNECT_ARGS,
+            insertmanyvalues_page_size=insertmanyvalues_page_size,
+        )
+    return create_async_engine(
+        database_url,
+        echo=echo,
+        future=True,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_pre_ping=True,
+        pool_recycle=pool_recycle,
+        insertmanyvalues_page_size=insertmanyvalues_page_size,
     )
 
+
+class Container(containers.DeclarativeContainer):
     # Configuration
     config = providers.Configuration()
 
     # Database settings
     config.database_url.from_value(settings.database_url)
+    config.db_pool_size.from_value(settings.db_pool_size)
+    config.db_max_overflow.from_value(settings.db_max_overflow)
+    config.db_pool_recycle.from_value(settings.db_pool_recycle)
+    config.db_pgbouncer.from_value(settings.db_pgbouncer)
+    config.db_insertmanyvalues_page_size.from_value(settings.db_insertmanyvalues_page_size)
+    # SQL loglama her sorguyu string'e çevirir, production'da kapalı
+    config.db_echo.from_value(settings.environment != "production")
 
     # JWT settings
     config.jwt_secret_key.from_value(settings.secret_key)
     config.jwt_algorithm.from_value(settings.algorithm)
     config.jwt_expire_minutes.from_value(settings.access_token_expire_minutes)
 
+    # Password hashing settings
+    config.argon2_time_cost.from_value(settings.argon2_time_cost)
+    config.argon2_memory_cost.from_value(settings.argon2_memory_cost)
+    config.argon2_parallelism.from_value(settings.argon2_parallelism)
+
     # Database
     engine = providers.Singleton(
-        create_async_engine,
+        _build_engine,
         config.database_url,
-        echo=True,
-        future=True
+        echo=config.db_echo,
+        pool_size=config.db_pool_size,
+        max_overflow=config.db_max_overflow,
+        pool_recycle=config.db_pool_recycle,
+        pgbouncer=config.db_pgbouncer,
+        insertmanyvalues_page_size=config.db_insertmanyvalues_page_size,
     )
 
     async_session_factory = providers.Singleton(
         async_sessionmaker,
         bind=engine,
         class_=AsyncSession,
-        expire_on_commit=False
+        expire_on_commit=False,
+        # Yazma yolları (run_in_transaction, base _add) zaten açıkça flush eder
+        autoflush=False,
+    )
+
+    # Password hashing
+    password_hasher = providers.Singleton(
+        PasswordHasher,
+        time_cost=config.argon2_time_cost,
+        memory_cost=config.argon2_memory_cost,
+        parallelism=config.argon2_parallelism,
     )
 
     # Repositories
@@ -72,6 +147,7 @@ class Container(containers.DeclarativeContainer):
         secret_key=config.jwt_secret_key,
         algorithm=config.jwt_algorithm,
         expire_minutes=config.jwt_expire_minutes,
+        password_hasher=password_hasher,
     )
 
     # Link service EKLENDI
@@ -1,9 +1,14 @@
+import asyncio
 import logging
-from fastapi import FastAPI, Request, APIRouter
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Type
+
+from fastapi import FastAPI, Request, Response, APIRouter, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
 # Import the db module for session factory setup
 import db
@@ -11,26 +16,51 @@ from di.container import Container
 from settings import settings
 from routers import user_router, auth_router, link_router, profile_router
 from core.exceptions import (
+    BaseAppException,
     NotAuthenticatedException,
     PermissionDeniedException,
     NotFoundException,
     DatabaseException, InvalidCredentialsException
 )
-from core.middleware.error_handler import setup_exception_handlers
-from core.utils.response_wrapper import add_response_model
-from core.schemas.response import ErrorResponse
+from core.middleware.error_handler import (
+    ExceptionASGIMiddleware,
+    error_json_response,
+    setup_exception_handlers,
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Exception class -> response message; None means the exception's own detail is used.
+# Static messages hit error_json_response's serialized-body cache.
+_EXCEPTION_MESSAGES: Dict[Type[Exception], Optional[str]] = {
+    NotAuthenticatedException: "Unauthorized access",
+    PermissionDeniedException: None,
+    NotFoundException: "Resource not found",
+    DatabaseException: "A database error occurred. Please try again later.",
+    InvalidCredentialsException: "Invalid credentials",
+}
+
+
+async def app_exception_handler(request: Request, exc: BaseAppException) -> Response:
+    """Single handler for the exceptions in _EXCEPTION_MESSAGES"""
+    message = _EXCEPTION_MESSAGES.get(type(exc))
+    if isinstance(exc, DatabaseException):
+        logger.error("Database Error: %s", exc.detail)
+    if message is None:
+        # exc.detail istek verisi içerebilir, önbelleğe alınmaz
+        return error_json_response(exc.status_code, exc.detail, headers=exc.headers, cached=False)
+    return error_json_response(exc.status_code, message, headers=exc.headers)
+
 
 def create_app() -> FastAPI:
     # Create FastAPI instance
     app = FastAPI(
         title="LinkYoSelf API",
         description="API for managing social media links",
-        version="0.1.0"
+        version="0.1.0",
+        default_response_class=ORJSONResponse,
     )
 
     # Configure security for production
@@ -47,52 +77,15 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Global exception middleware (outermost user middleware)
+    app.add_middleware(ExceptionASGIMiddleware)
+
     # Set up exception handlers
     setup_exception_handlers(app)
 
-    # Add specific exception handlers
-    @app.exception_handler(NotAuthenticatedException)
-    async def unauthorized_exception_handler(request: Request, exc: NotAuthenticatedException):
-        error_response = ErrorResponse.create(message="Unauthorized access")
-        return JSONResponse(
-            status_code=exc.status_code,
-            content=error_response.model_dump(),
-            headers=exc.headers
-        )
-
-    @app.exception_handler(PermissionDeniedException)
-    async def permission_denied_exception_handler(request: Request, exc: PermissionDeniedException):
-        error_response = ErrorResponse.create(message=exc.detail)
-        return JSONResponse(
-            status_code=exc.status_code,
-            content=error_response.model_dump()
-        )
-
-    @app.exception_handler(NotFoundException)
-    async def not_found_exception_handler(request: Request, exc: NotFoundException):
-        error_response = ErrorResponse.create(message="Resource not found")
-        return JSONResponse(
-            status_code=exc.status_code,
-            content=error_response.model_dump()
-        )
-
-    @app.exception_handler(DatabaseException)
-    async def database_exception_handler(request: Request, exc: DatabaseException):
-        logger.error(f"Database Error: {exc.detail}")
-        error_response = ErrorResponse.create(message="A database error occurred. Please try again later.")
-        return JSONResponse(
-            status_code=exc.status_code,
-            content=error_response.model_dump()
-        )
-
-    @app.exception_handler(InvalidCredentialsException)
-    async def invalid_credentials_exception_handler(request: Request, exc: InvalidCredentialsException):
-        error_response = ErrorResponse.create(message="Invalid credentials")
-        return JSONResponse(
-            status_code=exc.status_code,
-            content=error_response.model_dump(),
-            headers=exc.headers
-        )
+    # Add specific exception handlers (one shared handler, messages come from the table below)
+    for exception_class in _EXCEPTION_MESSAGES:
+        app.add_exception_handler(exception_class, app_exception_handler)
 
     # Create and configure the DI container
     container = Container()
@@ -103,35 +96,14 @@ def create_app() -> FastAPI:
     # Initialize database session factory
     db.set_session_factory(container.async_session_factory())
 
-    # Wire container to modules that need dependency injection
-    container.wire(
-        modules=[
-            "routers.user_router",
-            "routers.auth_router",
-            "routers.link_router",  # EKLENDI
-            "routers.profile_router",  # EKLENDI
-            "routers.v1.user_router",
-            "routers.v1.auth_router",
-            "routers.v1.link_router",  # EKLENDI
-            "routers.v1.profile_router",  # EKLENDI
-            "deps"
-        ]
-    )
-
-    # Router'ları BaseResponseModel ile sarmalama
-    wrapped_user_router = add_response_model(user_router.router)
-    wrapped_auth_router = add_response_model(auth_router.router)
-    wrapped_link_router = add_response_model(link_router.router)
-    wrapped_profile_router = add_response_model(profile_router.router)
-
-    # V1 API router'ı oluştur
-    api_v1_router = APIRouter(prefix="/api/v1")
+    # V1 API router'ı oluştur (her istek tek bir session/transaction içinde çalışır)
+    api_v1_router = APIRouter(prefix="/api/v1", dependencies=[Depends(db.get_db)])
 
     # Router'ları API v1 router'a ekle
-    api_v1_router.include_router(wrapped_user_router)
-    api_v1_router.include_router(wrapped_auth_router)
-    api_v1_router.include_router(wrapped_link_router)
-    api_v1_router.include_router(wrapped_profile_router)
+    api_v1_router.include_router(user_router.router)
+    api_v1_router.include_router(auth_router.router)
+    api_v1_router.include_router(link_router.router)
+    api_v1_router.include_router(profile_router.router)
 
     # API v1 router'ı uygulamaya ekle
     app.include_router(api_v1_router)
@@ -152,9 +124,25 @@ async def root():
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting LinkYoSelf API")
+    # bcrypt gibi CPU-bound işler için thread pool'u çekirdek sayısına göre ayarla
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=os.cpu_count())
+    )
+
+    # Bağlantı havuzunu ilk isteklerden önce doldur (PgBouncer modunda uygulama tarafında havuz yok)
+    if settings.db_pgbouncer:
+        return
+    engine = app.container.engine()
+    connections = await asyncio.gather(
+        *(engine.connect() for _ in range(settings.db_pool_size))
+    )
+    await asyncio.gather(*(connection.close() for connection in connections))
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down LinkYoSelf API")
+    # Bellekte bekleyen tıklama sayaçlarını engine kapanmadan yaz
+    await app.container.link_service().close_click_buffer()
+    await app.container.engine().dispose()
 
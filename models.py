@@ -1,7 +1,10 @@
-import datetime
+from functools import cached_property
 
-from sqlalchemy import Column, Integer, String, UniqueConstraint, ForeignKey, DateTime, Boolean, JSON, Text, func
-from sqlalchemy.orm import relationship, declarative_base, DeclarativeMeta
+from sqlalchemy import (
+    Column, Integer, String, UniqueConstraint, ForeignKey, DateTime, Boolean, JSON, Text, LargeBinary, Index, func, false,
+    exists, text,
+)
+from sqlalchemy.orm import relationship, declarative_base, DeclarativeMeta, column_property
 
 Base: DeclarativeMeta = declarative_base()
 
@@ -10,7 +13,7 @@ Base: DeclarativeMeta = declarative_base()
 class BaseModel(Base):
     __abstract__ = True
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=True)
     is_deleted = Column(Boolean, default=False, nullable=False)
@@ -49,6 +52,12 @@ class User(BaseModel):
     # Profil completion tracking
     profile_completed = Column(Boolean, default=False, nullable=False)
     onboarding_completed = Column(Boolean, default=False, nullable=False)
+    # UserRead'in tamamlama yüzdesi (7 profil alanı, linkler hariç); okumada hesaplanmaz,
+    # profil güncellenirken UserService.patch_user tarafından yazılır
+    profile_completion = Column(Integer, default=0, server_default=text("0"), nullable=False)
+
+    # Yetki
+    is_admin = Column(Boolean, default=False, server_default=false(), nullable=False)
 
     # İlişkiler
     social_accounts = relationship(
@@ -64,35 +73,38 @@ class User(BaseModel):
         order_by="Link.order_index"
     )
 
-    @property
+    # Türetilmiş değerler instance başına bir kez hesaplanır; her istek kullanıcıyı yeniden yüklediği için
+    # önbellek isteğin ömrüyle sınırlıdır
+    @cached_property
     def full_name(self) -> str:
         """Full name property"""
         if self.first_name and self.last_name:
             return f"{self.first_name} {self.last_name}"
         return self.first_name or self.last_name or self.username
 
-    @property
+    @cached_property
     def profile_display_name(self) -> str:
         """Display name for profile page"""
         return self.display_name or self.full_name or self.username
 
-    @property
+    @cached_property
     def profile_completion_percentage(self) -> int:
         """Calculate profile completion percentage"""
         total_fields = 8
-        completed_fields = 0
 
-        # Check required completion fields
-        if self.display_name: completed_fields += 1
-        if self.bio: completed_fields += 1
-        if self.profile_image_url: completed_fields += 1
-        if self.website: completed_fields += 1
-        if self.twitter_username or self.instagram_username or self.linkedin_username: completed_fields += 1
-        if self.page_title: completed_fields += 1
-        if self.page_description: completed_fields += 1
-        if len(self.links) > 0: completed_fields += 1  # En az bir link var mı
+        # Her tamamlanan alan bir bit; tamamlanan alan sayısı = set edilmiş bit sayısı (popcount)
+        completed_mask = (
+            bool(self.display_name)
+            | bool(self.bio) << 1
+            | bool(self.profile_image_url) << 2
+            | bool(self.website) << 3
+            | bool(self.twitter_username or self.instagram_username or self.linkedin_username) << 4
+            | bool(self.page_title) << 5
+            | bool(self.page_description) << 6
+            | bool(self.has_any_link) << 7  # En az bir link var mı (links yüklenmeden, EXISTS ile)
+        )
 
-        return int((completed_fields / total_fields) * 100)
+        return completed_mask.bit_count() * 100 // total_fields
 
 
 class Platform(BaseModel):
@@ -151,11 +163,17 @@ class PageSettings(BaseModel):
 class RefreshToken(BaseModel):
     __tablename__ = 'refresh_tokens'
 
-    token = Column(Text, nullable=False, unique=True, index=True)
+    # Token'ın kendisi değil, anahtarlı blake2b özeti saklanır
+    token_hash = Column(LargeBinary(32), nullable=False, unique=True, index=True)
     user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     expires_at = Column(DateTime(timezone=True), nullable=False)
     is_revoked = Column(Boolean, default=False, nullable=False)
 
+    __table_args__ = (
+        # Sadece aktif token'ları kapsayan kısmi index (toplu revoke için)
+        Index('ix_refresh_tokens_active', 'user_id', postgresql_where=is_revoked == false()),
+    )
+
     user = relationship('User')
 
 
@@ -179,5 +197,30 @@ class Link(BaseModel):
     click_count = Column(Integer, default=0, nullable=False)  # Analytics için
     order_index = Column(Integer, default=0, nullable=False)  # Sıralama için
 
+    __table_args__ = (
+        # Listeleme sorguları (user_id + is_deleted + is_active, order_index'e göre sıralı) için composite index
+        Index('ix_links_user_active_order', 'user_id', 'is_deleted', 'is_active', 'order_index'),
+        # Silinmemiş linkler arasında kullanıcı başına URL tekil; get_link_by_url ve ON CONFLICT bunu kullanır
+        Index(
+            'uq_links_user_url_live', 'user_id', 'url',
+            unique=True, postgresql_where=text('is_deleted = false'),
+        ),
+        # search_links'teki ILIKE '%...%' aramaları için pg_trgm GIN index'leri
+        Index('ix_links_title_trgm', 'title', postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}),
+        Index(
+            'ix_links_description_trgm', 'description',
+            postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'},
+        ),
+        Index('ix_links_url_trgm', 'url', postgresql_using='gin', postgresql_ops={'url': 'gin_trgm_ops'}),
+    )
+
     # İlişkiler
-    user = relationship('User', back_populates='links')
\ No newline at end of file
+    user = relationship('User', back_populates='links')
+
+
+# Kullanıcının silinmemiş en az bir linki var mı; links ilişkisini yüklemek yerine EXISTS alt sorgusu.
+# Deferred: sadece ihtiyaç duyulduğunda (UserRepository.load_has_any_link) yüklenir.
+User.has_any_link = column_property(
+    exists().where(Link.user_id == User.id, Link.is_deleted.is_(False)).correlate_except(Link),
+    deferred=True,
+)
@@ -1,10 +1,24 @@
-from typing import Optional
-from sqlalchemy import select, update, and_
+from typing import List, Optional, Tuple
+from sqlalchemy import bindparam, select, update, and_, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime
 
 from core.base_repository import BaseRepository
-from models import RefreshToken
+from models import RefreshToken, User
+
+
+# Token lookup sorguları modül yüklenirken bir kez kurulur, çağrı başına sadece parametre bağlanır
+_VALID_TOKEN_CRITERIA = and_(
+    RefreshToken.token_hash == bindparam("token_hash"),
+    RefreshToken.is_revoked.is_(False),
+    RefreshToken.expires_at > func.now()
+)
+_SELECT_BY_TOKEN = select(RefreshToken).where(RefreshToken.token_hash == bindparam("token_hash"))
+_SELECT_VALID_TOKEN = select(RefreshToken).where(_VALID_TOKEN_CRITERIA)
+_SELECT_VALID_TOKEN_WITH_USER = (
+    select(RefreshToken, User)
+    .join(User, RefreshToken.user_id == User.id)
+    .where(_VALID_TOKEN_CRITERIA)
+)
 
 
 class RefreshTokenRepository(BaseRepository[RefreshToken]):
@@ -16,61 +30,79 @@ class RefreshTokenRepository(BaseRepository[RefreshToken]):
         """Yeni bir refresh token oluşturur"""
         return await self.create(refresh_token)
 
-    async def get_by_token(self, token: str, transactional: bool = False) -> Optional[RefreshToken]:
+    async def get_by_token(self, token: bytes, transactional: bool = False) -> Optional[RefreshToken]:
         """Token değeri ile refresh token kaydını bulur"""
 
-        async def _get_by_token(session: AsyncSession, token_value: str) -> Optional[RefreshToken]:
-            result = await session.execute(
-                select(RefreshToken).where(RefreshToken.token == token_value)
-            )
+        async def _get_by_token(session: AsyncSession, token_value: bytes) -> Optional[RefreshToken]:
+            result = await session.execute(_SELECT_BY_TOKEN, {"token_hash": token_value})
             return result.scalars().first()
 
         return await self.execute_query(_get_by_token, token, transactional=transactional)
 
-    async def get_valid_token(self, token: str, transactional: bool = False) -> Optional[RefreshToken]:
+    async def get_valid_token(self, token: bytes, transactional: bool = False) -> Optional[RefreshToken]:
         """Geçerli bir refresh token kaydını bulur (süresi dolmamış ve revoke edilmemiş)"""
 
-        async def _get_valid_token(session: AsyncSession, token_value: str) -> Optional[RefreshToken]:
-            result = await session.execute(
-                select(RefreshToken).where(
-                    and_(
-                        RefreshToken.token == token_value,
-                        not RefreshToken.is_revoked,
-                        RefreshToken.expires_at > datetime.utcnow()
-                    )
-                )
-            )
+        async def _get_valid_token(session: AsyncSession, token_value: bytes) -> Optional[RefreshToken]:
+            result = await session.execute(_SELECT_VALID_TOKEN, {"token_hash": token_value})
             return result.scalars().first()
 
         return await self.execute_query(_get_valid_token, token, transactional=transactional)
 
-    async def revoke_token(self, token: str) -> None:
-        """Refresh token'ı geçersiz kılar"""
+    async def get_valid_token_with_user(
+            self, token: bytes, transactional: bool = False
+    ) -> Optional[Tuple[RefreshToken, User]]:
+        """Geçerli refresh token'ı ve sahibi olan kullanıcıyı tek sorguda getirir"""
+
+        async def _get_valid_token_with_user(
+                session: AsyncSession, token_value: bytes
+        ) -> Optional[Tuple[RefreshToken, User]]:
+            result = await session.execute(_SELECT_VALID_TOKEN_WITH_USER, {"token_hash": token_value})
+            row = result.first()
+            return tuple(row) if row else None
+
+        return await self.execute_query(_get_valid_token_with_user, token, transactional=transactional)
 
-        async def _revoke_token(session: AsyncSession, token_value: str) -> None:
-            await session.execute(
+    async def revoke_token(self, token: bytes) -> bool:
+        """Refresh token'ı geçersiz kılar; aktif bir token revoke edildiyse True döner (UPDATE ... RETURNING)"""
+
+        async def _revoke_token(session: AsyncSession, token_value: bytes) -> bool:
+            result = await session.execute(
                 update(RefreshToken)
-                .where(RefreshToken.token == token_value)
+                .where(
+                    and_(
+                        RefreshToken.token_hash == token_value,
+                        RefreshToken.is_revoked.is_(False)
+                    )
+                )
                 .values(is_revoked=True)
+                .returning(RefreshToken.id)
             )
-            await session.commit()
+            return result.scalar() is not None
 
         return await self.execute_query(_revoke_token, token, transactional=True)
 
-    async def revoke_all_user_tokens(self, user_id: int) -> None:
-        """Kullanıcının tüm refresh token'larını geçersiz kılar"""
+    async def revoke_all_user_tokens(self, user_id: int) -> List[int]:
+        """Kullanıcının tüm refresh token'larını tek bir UPDATE ile geçersiz kılar (ix_refresh_tokens_active kullanır)"""
 
-        async def _revoke_all_user_tokens(session: AsyncSession, user_id_: int) -> None:
-            await session.execute(
-                update(RefreshToken)
+        async def _revoke_all_user_tokens(session: AsyncSession, user_id_: int) -> List[int]:
+            # Eşzamanlı bir logout'un kilitlediği satırlar beklenmez, onlar zaten revoke ediliyor
+            active_tokens = (
+                select(RefreshToken.id)
                 .where(
                     and_(
                         RefreshToken.user_id == user_id_,
-                        not RefreshToken.is_revoked
+                        RefreshToken.is_revoked.is_(False)
                     )
                 )
+                .with_for_update(skip_locked=True)
+            )
+            result = await session.execute(
+                update(RefreshToken)
+                .where(RefreshToken.id.in_(active_tokens.scalar_subquery()))
                 .values(is_revoked=True)
+                .returning(RefreshToken.id)
             )
-            await session.commit()
+            # Revoke edilen token id'leri, ayrıca SELECT atmadan
+            return list(result.scalars().all())
 
         return await self.execute_query(_revoke_all_user_tokens, user_id, transactional=True)
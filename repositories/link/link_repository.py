@@ -1,13 +1,64 @@
 # repositories/link/link_repository.py
 
-from typing import List, Optional
-from sqlalchemy import select, update, func, and_
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import Row, bindparam, delete, exists, not_, select, text, update, func, and_, case
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.base_repository import BaseRepository
+from core.exceptions import AlreadyExistsException
 from models import Link
 
 
+# Duplicate URL kontrolü sorgusu modül yüklenirken bir kez kurulur
+_SELECT_BY_URL = select(Link).where(
+    and_(
+        Link.user_id == bindparam("user_id"),
+        Link.url == bindparam("url"),
+        Link.is_deleted.is_(False)
+    )
+)
+
+
+# LinkRead'in alanları; liste yanıtı ORM nesnesi ve Pydantic modeli kurmadan bu kolonlardan üretilir
+_LINK_READ_COLUMNS = (
+    Link.id, Link.user_id, Link.title, Link.url, Link.description, Link.icon_url, Link.background_color,
+    Link.text_color, Link.border_radius, Link.is_active, Link.click_count, Link.order_index,
+    Link.created_at, Link.updated_at,
+)
+
+
+def _links_query(user_id: int, is_active: Optional[bool], *columns):
+    """
+    Silinmemiş linkler, order_index'e göre sıralı; is_active None ise aktif/pasif ayrımı yapılmaz.
+    Tüm liste sorguları bu tek şekli kullanır, böylece SQLAlchemy'nin derlenmiş statement cache'inde
+    iki anahtarla (filtreli/filtresiz) kalır. columns verilirse Link yerine sadece o kolonlar seçilir.
+    """
+    query = select(*(columns or (Link,))).where(Link.user_id == user_id, Link.is_deleted.is_(False))
+    if is_active is not None:
+        query = query.where(Link.is_active == is_active)
+    return query.order_by(Link.order_index.asc())
+
+
+async def _list_links(session: AsyncSession, user_id: int, is_active: Optional[bool]) -> List[Link]:
+    result = await session.execute(_links_query(user_id, is_active))
+    return result.scalars().all()
+
+
+async def _update_owned(session: AsyncSession, link_id: int, user_id: int, values: Dict) -> Optional[Link]:
+    # Sahiplik kontrolü WHERE içinde; satır dönmezse link yok ya da başka kullanıcıya ait
+    result = await session.execute(
+        update(Link)
+        .where(and_(Link.id == link_id, Link.user_id == user_id))
+        .values(**values)
+        .returning(Link),
+        execution_options={"synchronize_session": False, "populate_existing": True},
+    )
+    return result.scalar_one_or_none()
+
+
 class LinkRepository(BaseRepository[Link]):
     def __init__(self, session_factory):
         super().__init__(session_factory)
@@ -17,6 +68,79 @@ class LinkRepository(BaseRepository[Link]):
         """Yeni link oluşturur"""
         return await self.create(link)
 
+    async def create_link_at_end(self, link: Link) -> Optional[Link]:
+        """
+        Linki kullanıcının listesinin sonuna ekler. order_index, INSERT içinde bir alt sorguyla
+        (MAX(order_index) + 1) hesaplanır; ayrı bir sorgu gerekmez.
+        Kullanıcının aynı URL'ye sahip silinmemiş bir linki varsa hiçbir şey eklenmez ve None döner.
+        """
+
+        async def _create_link_at_end(session: AsyncSession, link_: Link) -> Optional[Link]:
+            values = {
+                column.key: getattr(link_, column.key)
+                for column in Link.__table__.columns
+                if getattr(link_, column.key) is not None
+            }
+            values["order_index"] = (
+                select(func.coalesce(func.max(Link.order_index), 0) + 1)
+                .where(and_(Link.user_id == link_.user_id, Link.is_deleted.is_(False)))
+                .scalar_subquery()
+            )
+            result = await session.execute(
+                insert(Link)
+                .values(**values)
+                .on_conflict_do_nothing(
+                    index_elements=[Link.user_id, Link.url],
+                    # uq_links_user_url_live index'inin koşuluyla birebir aynı olmalı
+                    index_where=text("is_deleted = false"),
+                )
+                .returning(Link)
+            )
+            return result.scalars().first()
+
+        return await self.execute_query(_create_link_at_end, link, transactional=True)
+
+    async def create_many(self, links: List[Link]) -> List[Link]:
+        """
+        Linkleri tek bir çok satırlı INSERT ... RETURNING ile kullanıcının listesinin sonuna ekler
+        (engine'in insertmanyvalues_page_size'ı kadar satırlık parçalar halinde).
+        Silinmemiş bir linkte zaten olan URL'ler atlanır; sadece eklenen linkler order_index sırasıyla döner.
+        """
+
+        async def _create_many(session: AsyncSession, links_: List[Link]) -> List[Link]:
+            if not links_:
+                return []
+
+            # Aynı isteğin linkleri aynı kullanıcıya ait; son sıra bir kez okunur, yeni linkler ardına dizilir
+            user_id = links_[0].user_id
+            max_order = await session.scalar(
+                select(func.coalesce(func.max(Link.order_index), 0))
+                .where(and_(Link.user_id == user_id, Link.is_deleted.is_(False)))
+            )
+            rows = []
+            for offset, link_ in enumerate(links_, start=1):
+                values = {
+                    column.key: getattr(link_, column.key)
+                    for column in Link.__table__.columns
+                    if getattr(link_, column.key) is not None
+                }
+                values["order_index"] = max_order + offset
+                rows.append(values)
+
+            result = await session.scalars(
+                insert(Link)
+                .on_conflict_do_nothing(
+                    index_elements=[Link.user_id, Link.url],
+                    # uq_links_user_url_live index'inin koşuluyla birebir aynı olmalı
+                    index_where=text("is_deleted = false"),
+                )
+                .returning(Link),
+                rows,
+            )
+            return sorted(result.all(), key=lambda created: created.order_index)
+
+        return await self.execute_query(_create_many, links, transactional=True)
+
     async def update_link(self, link: Link) -> Link:
         """Link günceller"""
         return await self.update(link)
@@ -25,81 +149,182 @@ class LinkRepository(BaseRepository[Link]):
         """Link siler"""
         await self.delete(link)
 
-    async def get_links_by_user(self, user_id: int, include_inactive: bool = False) -> List[Link]:
-        """Kullanıcının linklerini order_index'e göre sıralı şekilde getirir"""
+    async def update_owned(self, link_id: int, user_id: int, fields: Dict) -> Optional[Link]:
+        """
+        Kullanıcıya ait linki tek bir UPDATE ... RETURNING ile günceller; eşleşme yoksa None döner.
+        URL, kullanıcının silinmemiş başka bir linkinde varsa AlreadyExistsException (409) fırlatır.
+        """
+        try:
+            return await self.execute_query(_update_owned, link_id, user_id, fields, transactional=True)
+        except IntegrityError as exc:
+            # Sadece uq_links_user_url_live ihlali 409'a çevrilir; diğer bütünlük hataları olduğu gibi yükselir
+            if "url" not in fields or "uq_links_user_url_live" not in str(exc.orig):
+                raise
+            raise AlreadyExistsException(detail=f"This URL already exists in your links: {fields['url']}") from None
+
+    async def toggle_active_owned(self, link_id: int, user_id: int) -> Optional[Link]:
+        """is_active = NOT is_active, tek statement'ta; eşleşme yoksa None döner"""
+        return await self.execute_query(
+            _update_owned, link_id, user_id, {"is_active": not_(Link.is_active)}, transactional=True
+        )
+
+    async def delete_owned(self, link_id: int, user_id: int) -> bool:
+        """Kullanıcıya ait linki DELETE ... RETURNING id ile siler; silindiyse True döner"""
+
+        async def _delete_owned(session: AsyncSession, link_id: int, user_id: int) -> bool:
+            result = await session.execute(
+                delete(Link)
+                .where(and_(Link.id == link_id, Link.user_id == user_id))
+                .returning(Link.id),
+                execution_options={"synchronize_session": False},
+            )
+            return result.scalar() is not None
+
+        return await self.execute_query(_delete_owned, link_id, user_id, transactional=True)
+
+    async def link_exists(self, link_id: int) -> bool:
+        """EXISTS check on link id, without loading the row"""
+
+        async def _link_exists(session: AsyncSession, link_id: int) -> bool:
+            return bool(await session.scalar(select(exists().where(Link.id == link_id))))
+
+        return await self.execute_query(_link_exists, link_id, transactional=False)
+
+    async def get_links_by_user_dicts(self, user_id: int, include_inactive: bool = False) -> List[Dict[str, Any]]:
+        """
+        Kullanıcının linkleri order_index'e göre sıralı, LinkRead kolonlarından dict'ler olarak;
+        ORM nesnesi kurulmaz, None alanlar atılır, doğrudan JSON'a yazılabilir
+        """
+
+        async def _get_links_dicts(
+                session: AsyncSession, user_id: int, is_active: Optional[bool]
+        ) -> List[Dict[str, Any]]:
+            result = await session.execute(_links_query(user_id, is_active, *_LINK_READ_COLUMNS))
+            return [
+                {key: value for key, value in row.items() if value is not None}
+                for row in result.mappings()
+            ]
+
+        is_active = None if include_inactive else True
+        return await self.execute_query(_get_links_dicts, user_id, is_active, transactional=False)
+
+    async def iter_links_by_user(
+            self, user_id: int, include_inactive: bool = False, batch_size: int = 500
+    ) -> AsyncIterator[Link]:
+        """
+        Kullanıcının linkleri order_index'e göre sıralı, tümü belleğe alınmadan;
+        server-side cursor ile batch_size'lık parçalarla okunur
+        """
+        is_active = None if include_inactive else True
+        query = _links_query(user_id, is_active).execution_options(yield_per=batch_size)
+        async for link in self.stream_scalars(query):
+            yield link
+
+    async def reorder_and_return(self, user_id: int, ordered_link_ids: List[int]) -> List[Link]:
+        """Sırayı tek bir UPDATE ... CASE ... RETURNING ile günceller; güncellenen linkleri yeni sırayla döner"""
+
+        async def _reorder_and_return(session: AsyncSession, user_id: int, ordered_link_ids: List[int]) -> List[Link]:
+            if not ordered_link_ids:
+                return []
+
+            new_orders = {link_id: index for index, link_id in enumerate(ordered_link_ids, start=1)}
+            result = await session.scalars(
+                update(Link)
+                .where(and_(Link.id.in_(new_orders), Link.user_id == user_id))
+                .values(order_index=case(new_orders, value=Link.id))
+                .returning(Link),
+                # Oturumda zaten yüklü linkler RETURNING satırlarıyla tazelenir, ayrıca senkronizasyon gerekmez
+                execution_options={"synchronize_session": False, "populate_existing": True},
+            )
+            return sorted(result.all(), key=lambda link: link.order_index)
+
+        return await self.execute_query(_reorder_and_return, user_id, ordered_link_ids, transactional=True)
 
-        async def _get_links(session: AsyncSession, user_id: int, include_inactive: bool) -> List[Link]:
-            query = select(Link).where(Link.user_id == user_id)
+    async def get_link_url(self, link_id: int) -> Optional[str]:
+        """Sadece linkin URL'sini okur (tıklama yönlendirmesi için)"""
 
-            if not include_inactive:
-                query = query.where(Link.is_active)
+        async def _get_link_url(session: AsyncSession, link_id: int) -> Optional[str]:
+            return await session.scalar(select(Link.url).where(Link.id == link_id))
 
-            # is_deleted = False kontrolü ekleyelim (soft delete için)
-            query = query.where(not Link.is_deleted)
-            query = query.order_by(Link.order_index.asc())
+        return await self.execute_query(_get_link_url, link_id, transactional=False)
 
-            result = await session.execute(query)
-            return result.scalars().all()
+    async def add_click_counts(self, deltas: Dict[int, int]) -> None:
+        """Birikmiş tıklamaları tek bir UPDATE ... SET click_count = click_count + CASE id WHEN ... END ile yazar"""
 
-        return await self.execute_query(_get_links, user_id, include_inactive, transactional=False)
+        async def _add_click_counts(session: AsyncSession, deltas: Dict[int, int]) -> None:
+            if not deltas:
+                return
+            await session.execute(
+                update(Link)
+                .where(Link.id.in_(deltas))
+                .values(click_count=Link.click_count + case(deltas, value=Link.id))
+                .execution_options(synchronize_session=False)
+            )
+
+        await self.execute_query(_add_click_counts, deltas, transactional=True)
 
-    async def get_max_order_for_user(self, user_id: int) -> Optional[int]:
-        """Kullanıcının linklerinin maksimum order değerini getirir"""
+    async def get_link_ids_by_user(self, user_id: int) -> Set[int]:
+        """Kullanıcının silinmemiş link id'leri; ORM nesnesi yüklemeden"""
 
-        async def _get_max_order(session: AsyncSession, user_id: int) -> Optional[int]:
-            query = select(func.max(Link.order_index)).where(
-                and_(Link.user_id == user_id, not Link.is_deleted)
+        async def _get_link_ids(session: AsyncSession, user_id: int) -> Set[int]:
+            result = await session.scalars(
+                select(Link.id).where(and_(Link.user_id == user_id, Link.is_deleted.is_(False)))
             )
-            result = await session.execute(query)
-            return result.scalar()
+            return set(result.all())
 
-        return await self.execute_query(_get_max_order, user_id, transactional=False)
+        return await self.execute_query(_get_link_ids, user_id, transactional=False)
 
-    async def update_link_orders(self, user_id: int, ordered_link_ids: List[int]) -> None:
-        """Kullanıcının linklerinin sırasını günceller"""
+    async def get_links_version(self, user_id: int) -> Tuple[int, Optional[datetime]]:
+        """(link sayısı, en son updated_at); liste değişti mi kontrolü (ETag) için tek aggregate sorgu"""
 
-        async def _update_orders(session: AsyncSession, user_id: int, ordered_link_ids: List[int]) -> None:
-            # Her link ID için yeni order_index değerini hesapla ve güncelle
-            for index, link_id in enumerate(ordered_link_ids):
-                await session.execute(
-                    update(Link)
-                    .where(and_(Link.id == link_id, Link.user_id == user_id))
-                    .values(order_index=index + 1)
-                )
+        async def _get_links_version(session: AsyncSession, user_id: int) -> Tuple[int, Optional[datetime]]:
+            result = await session.execute(
+                select(func.count(), func.max(Link.updated_at))
+                .where(and_(Link.user_id == user_id, Link.is_deleted.is_(False)))
+            )
+            count, max_updated_at = result.one()
+            return count, max_updated_at
 
-            await session.flush()
+        return await self.execute_query(_get_links_version, user_id, transactional=False)
 
-        await self.execute_query(_update_orders, user_id, ordered_link_ids, transactional=True)
+    async def analytics_for_user(self, user_id: int) -> Tuple[int, int, int]:
+        """(toplam link, aktif link, toplam tıklama) tek bir aggregate sorguyla"""
 
-    async def get_public_links(self, user_id: int) -> List[Link]:
-        """Kullanıcının public sayfası için aktif linklerini getirir"""
+        async def _analytics_for_user(session: AsyncSession, user_id: int) -> Tuple[int, int, int]:
+            result = await session.execute(
+                select(
+                    func.count(),
+                    func.count().filter(Link.is_active.is_(True)),
+                    func.coalesce(func.sum(Link.click_count), 0),
+                ).where(and_(Link.user_id == user_id, Link.is_deleted.is_(False)))
+            )
+            total_links, active_links, total_clicks = result.one()
+            return total_links, active_links, total_clicks
 
-        async def _get_public_links(session: AsyncSession, user_id: int) -> List[Link]:
-            query = select(Link).where(
-                and_(
-                    Link.user_id == user_id,
-                    Link.is_active,
-                    not Link.is_deleted
-                )
-            ).order_by(Link.order_index.asc())
+        return await self.execute_query(_analytics_for_user, user_id, transactional=False)
 
-            result = await session.execute(query)
-            return result.scalars().all()
+    async def list_for_analytics(self, user_id: int) -> Sequence[Row]:
+        """Analytics listesi için sadece gereken kolonlar, tıklamaya göre azalan; ORM nesnesi oluşturulmaz"""
+
+        async def _list_for_analytics(session: AsyncSession, user_id: int) -> Sequence[Row]:
+            result = await session.execute(
+                select(Link.id, Link.title, Link.url, Link.click_count, Link.is_active)
+                .where(and_(Link.user_id == user_id, Link.is_deleted.is_(False)))
+                .order_by(Link.click_count.desc())
+            )
+            return result.all()
+
+        return await self.execute_query(_list_for_analytics, user_id, transactional=False)
 
-        return await self.execute_query(_get_public_links, user_id, transactional=False)
+    async def get_public_links(self, user_id: int) -> List[Link]:
+        """Kullanıcının public sayfası için aktif linklerini getirir"""
+        return await self.execute_query(_list_links, user_id, True, transactional=False)
 
     async def get_link_by_url(self, user_id: int, url: str) -> Optional[Link]:
         """Kullanıcının belirli URL'ye sahip linkini getirir (duplicate kontrolü için)"""
 
         async def _get_by_url(session: AsyncSession, user_id: int, url: str) -> Optional[Link]:
-            query = select(Link).where(
-                and_(
-                    Link.user_id == user_id,
-                    Link.url == url,
-                    not Link.is_deleted
-                )
-            )
-            result = await session.execute(query)
+            result = await session.execute(_SELECT_BY_URL, {"user_id": user_id, "url": url})
             return result.scalars().first()
 
         return await self.execute_query(_get_by_url, user_id, url, transactional=False)
@@ -111,7 +336,8 @@ class LinkRepository(BaseRepository[Link]):
             query = select(Link).where(
                 and_(
                     Link.user_id == user_id,
-                    not Link.is_deleted,
+                    Link.is_deleted.is_(False),
+                    # Her kolon için pg_trgm GIN index'i var, OR'lu ILIKE'lar BitmapOr ile index'ten çözülür
                     (Link.title.ilike(f"%{search_term}%") |
                      Link.description.ilike(f"%{search_term}%") |
                      Link.url.ilike(f"%{search_term}%"))
@@ -125,17 +351,4 @@ class LinkRepository(BaseRepository[Link]):
 
     async def get_links_by_status(self, user_id: int, is_active: bool) -> List[Link]:
         """Kullanıcının belirli durumda olan linklerini getirir"""
-
-        async def _get_by_status(session: AsyncSession, user_id: int, is_active: bool) -> List[Link]:
-            query = select(Link).where(
-                and_(
-                    Link.user_id == user_id,
-                    Link.is_active == is_active,
-                    not Link.is_deleted
-                )
-            ).order_by(Link.order_index.asc())
-
-            result = await session.execute(query)
-            return result.scalars().all()
-
-        return await self.execute_query(_get_by_status, user_id, is_active, transactional=False)
\ No newline at end of file
+        return await self.execute_query(_list_links, user_id, is_active, transactional=False)
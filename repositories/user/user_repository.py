@@ -1,32 +1,89 @@
-from typing import Optional, Sequence, Awaitable
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, exists, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload, selectinload
+from sqlalchemy.orm.interfaces import ORMOption
 
 from core.base_repository import BaseRepository
 from models import User
 
 
+# Sık kullanılan lookup sorguları modül yüklenirken bir kez kurulur, çağrı başına sadece parametre bağlanır
+_SELECT_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+_SELECT_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+# Kimlik doğrulamada yalnızca değişmeyen kimlik kolonları okunur (parola hash'i ve profil kolonları hariç)
+_SELECT_IDENTITY_BY_USERNAME = select(User.id, User.username, User.is_admin).where(
+    User.username == bindparam("username")
+)
+
+# Profil sayfası ilişkileri; kullanıcı her istekte yüklendiği için mapping'de değil, sorgu tarafında eager-load edilir
+PROFILE_RELATIONSHIPS = (selectinload(User.page_settings), selectinload(User.social_accounts))
+
+# UserRead'in alanları; kullanıcı listesi ORM nesnesi kurmadan bu kolonlardan üretilir
+_USER_READ_COLUMNS = (
+    User.id, User.username, User.email, User.first_name, User.last_name, User.display_name, User.bio,
+    User.profile_image_url, User.page_title, User.page_description, User.website, User.twitter_username,
+    User.instagram_username, User.linkedin_username, User.theme_color, User.background_type, User.background_value,
+    User.profile_completed, User.onboarding_completed, User.created_at, User.updated_at,
+    User.profile_completion.label("profile_completion_percentage"),
+)
+
+
 class UserRepository(BaseRepository[User]):
     def __init__(self, session_factory):
         super().__init__(session_factory)
         self._model_type = User
 
-    async def list_users(self, transactional: bool = False) -> Awaitable[Sequence[User]]:
-        """Get all users with optional transaction control"""
-        return await self.list_all(transactional=transactional)
+    async def list_users(
+            self,
+            transactional: bool = False,
+            options: Optional[Sequence[ORMOption]] = None,
+    ) -> Sequence[User]:
+        """
+        Get all users with optional transaction control.
+        Relationships raise on access unless eager-loading options are passed,
+        so an accidental lazy load can't turn the list into N+1 queries.
+        """
+
+        async def _list_users(session: AsyncSession, options_: Sequence[ORMOption]) -> Sequence[User]:
+            result = await session.execute(select(User).options(*options_))
+            return result.scalars().all()
+
+        return await self.execute_query(
+            _list_users, options if options is not None else (raiseload("*"),), transactional=transactional
+        )
+
+    async def list_user_rows(self) -> List[Dict[str, Any]]:
+        """list_users'ın kolon versiyonu; UserRead alan adlarıyla dict'ler, ORM nesnesi oluşturulmaz"""
+
+        async def _list_user_rows(session: AsyncSession) -> List[Dict[str, Any]]:
+            result = await session.execute(select(*_USER_READ_COLUMNS))
+            return [dict(row) for row in result.mappings()]
+
+        return await self.execute_query(_list_user_rows, transactional=False)
 
-    async def get_user(self, user_id: int, transactional: bool = False) -> Optional[User]:
-        """Get user by ID with optional transaction control"""
-        return await self.get_by_id(user_id, transactional=transactional)
+    async def get_user(
+            self,
+            user_id: int,
+            transactional: bool = False,
+            options: Optional[Sequence[ORMOption]] = None,
+    ) -> Optional[User]:
+        """Get user by ID; pass e.g. PROFILE_RELATIONSHIPS when relationships will be read"""
+        if not options:
+            return await self.get_by_id(user_id, transactional=transactional)
+
+        async def _get_user(session: AsyncSession, user_id_: int, options_: Sequence[ORMOption]) -> Optional[User]:
+            return await session.get(User, user_id_, options=options_)
+
+        return await self.execute_query(_get_user, user_id, options, transactional=transactional)
 
     async def get_by_username(self, username: str, transactional: bool = False) -> Optional[User]:
         """Get user by username with optional transaction control"""
 
         async def _get_by_username(session: AsyncSession, username_: str) -> Optional[User]:
-            result = await session.execute(
-                select(User).where(User.username == username_)
-            )
+            result = await session.execute(_SELECT_BY_USERNAME, {"username": username_})
             return result.scalars().first()
 
         # Use the execute_query helper for flexible transaction handling
@@ -36,22 +93,82 @@ class UserRepository(BaseRepository[User]):
         """Get user by email with optional transaction control"""
 
         async def _get_by_email(session: AsyncSession, email_: str) -> Optional[User]:
-            result = await session.execute(
-                select(User).where(User.email == email_)
-            )
+            result = await session.execute(_SELECT_BY_EMAIL, {"email": email_})
             return result.scalars().first()
 
         # Use the execute_query helper for flexible transaction handling
         return await self.execute_query(_get_by_email, email, transactional=transactional)
 
+    async def get_identity(self, username: str) -> Optional[Tuple[int, str, bool]]:
+        """(id, username, is_admin) of a user, without loading the ORM object"""
+
+        async def _get_identity(session: AsyncSession, username_: str) -> Optional[Tuple[int, str, bool]]:
+            result = await session.execute(_SELECT_IDENTITY_BY_USERNAME, {"username": username_})
+            return result.first()
+
+        return await self.execute_query(_get_identity, username, transactional=False)
+
+    async def load_has_any_link(self, user: User) -> User:
+        """Load the deferred has_any_link flag with a single EXISTS query"""
+
+        async def _load_has_any_link(session: AsyncSession, user_: User) -> User:
+            await session.refresh(user_, attribute_names=["has_any_link"])
+            return user_
+
+        return await self.execute_query(_load_has_any_link, user)
+
     async def create_user(self, user: User) -> User:
         """Create a new user (always transactional)"""
         return await self.create(user)
 
+    async def insert_if_absent(self, user: User) -> Optional[User]:
+        """Insert a user unless the username/email is taken; returns None on conflict (single round-trip)"""
+
+        async def _insert_if_absent(session: AsyncSession, user_: User) -> Optional[User]:
+            values = {
+                column.key: getattr(user_, column.key)
+                for column in User.__table__.columns
+                if getattr(user_, column.key) is not None
+            }
+            result = await session.execute(
+                insert(User)
+                .values(**values)
+                .on_conflict_do_nothing()
+                .returning(User)
+            )
+            return result.scalars().first()
+
+        return await self.execute_query(_insert_if_absent, user, transactional=True)
+
+    async def username_exists(self, username: str) -> bool:
+        """EXISTS check on username, without loading the user row"""
+
+        async def _username_exists(session: AsyncSession, username_: str) -> bool:
+            result = await session.execute(select(exists().where(User.username == username_)))
+            return bool(result.scalar())
+
+        return await self.execute_query(_username_exists, username)
+
     async def update_user(self, user: User) -> User:
         """Update an existing user (always transactional)"""
         return await self.update(user)
 
+    async def patch(self, user_id: int, fields: Dict[str, Any]) -> Optional[User]:
+        """Sadece verilen kolonları tek bir UPDATE ... RETURNING ile günceller"""
+
+        async def _patch(session: AsyncSession, user_id_: int, fields_: Dict[str, Any]) -> Optional[User]:
+            result = await session.execute(
+                update(User)
+                .where(User.id == user_id_)
+                .values(**fields_)
+                .returning(User),
+                # Oturumdaki kullanıcı (current_user) RETURNING satırıyla tazelenir
+                execution_options={"synchronize_session": False, "populate_existing": True},
+            )
+            return result.scalar_one_or_none()
+
+        return await self.execute_query(_patch, user_id, fields, transactional=True)
+
     async def delete_user(self, user: User) -> None:
         """Delete a user (always transactional)"""
         await self.delete(user)
@@ -1,15 +1,26 @@
 # routers/v1/link_router.py
 
-from typing import List
-from fastapi import APIRouter, Depends, status, Query
-from dependency_injector.wiring import inject, Provide
-
-from core.schemas.response import SuccessResponse  # BaseResponseModel yerine
-from deps import get_current_user
-from di.container import Container
-from models import User
+from typing import AsyncIterator, List
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+
+from core.schemas.messages import (
+    MSG_ANALYTICS_RETRIEVED,
+    MSG_CLICK_RECORDED,
+    MSG_LINKS_REORDERED,
+    MSG_LINKS_RETRIEVED,
+    MSG_LINK_CREATED,
+    MSG_LINK_RETRIEVED,
+    MSG_LINK_TOGGLED,
+    MSG_LINK_UPDATED,
+)
+from core.schemas.response import STATUS_SUCCESS, SuccessResponse  # BaseResponseModel yerine
+from core.utils.etag import etag_matches, make_etag
+from deps import get_current_identity, get_link_service
 from services.link.link_service import LinkService
+from services.user.user_service import UserIdentity
 from services.link.link_service_dto import (
+    LinkBulkCreate,
     LinkCreate,
     LinkUpdate,
     LinkRead,
@@ -20,131 +31,178 @@ router = APIRouter(tags=["links"])
 
 
 @router.post("/", response_model=SuccessResponse[LinkRead], status_code=status.HTTP_201_CREATED)
-@inject
 async def create_link(
     link_data: LinkCreate,
-    current_user: User = Depends(get_current_user),
-    link_service: LinkService = Depends(Provide[Container.link_service])
+    current_user: UserIdentity = Depends(get_current_identity),
+    link_service: LinkService = Depends(get_link_service)
 ):
     """Yeni link oluşturur"""
     link = await link_service.create_link(current_user.id, link_data)
-    return SuccessResponse.create(
+    return SuccessResponse.model_construct(
         data=link,
-        message="Link successfully created"
+        message=MSG_LINK_CREATED
+    )
+
+
+@router.post(
+    "/bulk",
+    response_model=SuccessResponse[List[LinkRead]],
+    response_model_exclude_none=True,
+    status_code=status.HTTP_201_CREATED,
+)
+async def import_links(
+    bulk_data: LinkBulkCreate,
+    current_user: UserIdentity = Depends(get_current_identity),
+    link_service: LinkService = Depends(get_link_service)
+):
+    """Birden çok linki tek istekte ekler; mevcut URL'ler atlanır"""
+    links = await link_service.import_links(current_user.id, bulk_data)
+    return SuccessResponse.model_construct(
+        data=links,
+        message=f"{len(links)} links imported"
     )
 
 
-@router.get("/", response_model=SuccessResponse[List[LinkRead]])
-@inject
+# Liste, LinkRead kolonlarından kurulan dict'ler olarak doğrudan orjson ile yazılır; link başına Pydantic doğrulaması yok
+@router.get(
+    "/",
+    response_class=ORJSONResponse,
+    responses={200: {"model": SuccessResponse[List[LinkRead]]}, 304: {"description": "Not Modified"}},
+)
 async def get_my_links(
+    request: Request,
     include_inactive: bool = Query(False, description="Include inactive links"),
-    current_user: User = Depends(get_current_user),
-    link_service: LinkService = Depends(Provide[Container.link_service])
+    current_user: UserIdentity = Depends(get_current_identity),
+    link_service: LinkService = Depends(get_link_service)
 ):
     """Kullanıcının linklerini getirir"""
+    # Liste değişmediyse (aynı sayı ve son updated_at) liste okunmadan 304 döner
+    count, max_updated_at = await link_service.get_links_version(current_user.id)
+    etag = make_etag(current_user.id, include_inactive, count, max_updated_at)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
     links = await link_service.get_user_links(current_user.id, include_inactive)
-    return SuccessResponse.create(
-        data=links,
-        message="Links retrieved successfully"
-    )
+    return ORJSONResponse({
+        "status": STATUS_SUCCESS,
+        "message": MSG_LINKS_RETRIEVED,
+        "data": links
+    }, headers={"ETag": etag})
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_my_links(
+    include_inactive: bool = Query(False, description="Include inactive links"),
+    current_user: UserIdentity = Depends(get_current_identity),
+    link_service: LinkService = Depends(get_link_service)
+):
+    """Kullanıcının linklerini NDJSON olarak akıtır (her satır bir LinkRead); çok sayıda link için"""
+
+    async def _ndjson_lines(user_id: int) -> AsyncIterator[bytes]:
+        async for link in link_service.iter_user_links(user_id, include_inactive):
+            yield LinkRead.model_validate(link).model_dump_json(exclude_none=True).encode() + b"\n"
+
+    return StreamingResponse(_ndjson_lines(current_user.id), media_type="application/x-ndjson")
 
 
 @router.get("/{link_id}", response_model=SuccessResponse[LinkRead])
-@inject
 async def get_link(
     link_id: int,
-    current_user: User = Depends(get_current_user),
-    link_service: LinkService = Depends(Provide[Container.link_service])
+    current_user: UserIdentity = Depends(get_current_identity),
+    link_service: LinkService = Depends(get_link_service)
 ):
     """Belirli bir link getirir"""
     link = await link_service.get_link_by_id(link_id, current_user.id)
-    return SuccessResponse.create(
+    return SuccessResponse.model_construct(
         data=link,
-        message="Link retrieved successfully"
+        message=MSG_LINK_RETRIEVED
     )
 
 
 @router.put("/{link_id}", response_model=SuccessResponse[LinkRead])
-@inject
 async def update_link(
     link_id: int,
     link_data: LinkUpdate,
-    current_user: User = Depends(get_current_user),
-    link_service: LinkService = Depends(Provide[Container.link_service])
+    current_user: UserIdentity = Depends(get_current_identity),
+    link_service: LinkService = Depends(get_link_service)
 ):
     """Link günceller"""
     link = await link_service.update_link(link_id, current_user.id, link_data)
-    return SuccessResponse.create(
+    return SuccessResponse.model_construct(
         data=link,
-        message="Link successfully updated"
+        message=MSG_LINK_UPDATED
     )
 
 
 @router.delete("/{link_id}", status_code=status.HTTP_204_NO_CONTENT)
-@inject
 async def delete_link(
     link_id: int,
-    current_user: User = Depends(get_current_user),
-    link_service: LinkService = Depends(Provide[Container.link_service])
+    current_user: UserIdentity = Depends(get_current_identity),
+    link_service: LinkService = Depends(get_link_service)
 ):
     """Link siler"""
     await link_service.delete_link(link_id, current_user.id)
 
 
-@router.post("/reorder", response_model=SuccessResponse[List[LinkRead]])
-@inject
+@router.post("/reorder", response_model=SuccessResponse[List[LinkRead]], response_model_exclude_none=True)
 async def reorder_links(
     reorder_data: LinkReorderRequest,
-    current_user: User = Depends(get_current_user),
-    link_service: LinkService = Depends(Provide[Container.link_service])
+    current_user: UserIdentity = Depends(get_current_identity),
+    link_service: LinkService = Depends(get_link_service)
 ):
     """Linklerin sırasını değiştirir"""
     links = await link_service.reorder_links(current_user.id, reorder_data)
-    return SuccessResponse.create(
+    return SuccessResponse.model_construct(
         data=links,
-        message="Links reordered successfully"
+        message=MSG_LINKS_REORDERED
     )
 
 
 @router.patch("/{link_id}/toggle", response_model=SuccessResponse[LinkRead])
-@inject
 async def toggle_link_status(
     link_id: int,
-    current_user: User = Depends(get_current_user),
-    link_service: LinkService = Depends(Provide[Container.link_service])
+    current_user: UserIdentity = Depends(get_current_identity),
+    link_service: LinkService = Depends(get_link_service)
 ):
     """Link'in aktif/pasif durumunu değiştirir"""
     link = await link_service.toggle_link_status(link_id, current_user.id)
-    return SuccessResponse.create(
+    return SuccessResponse.model_construct(
         data=link,
-        message="Link status toggled successfully"
+        message=MSG_LINK_TOGGLED
     )
 
 
-@router.get("/analytics/summary", response_model=SuccessResponse[dict])
-@inject
+# Sıcak, düz dict döndüren endpoint'ler: yanıt doğrudan orjson ile yazılır, response_model doğrulaması yapılmaz.
+# Şema dokümantasyon için responses'ta kalır.
+@router.get(
+    "/analytics/summary",
+    response_class=ORJSONResponse,
+    responses={200: {"model": SuccessResponse[dict]}},
+)
 async def get_link_analytics(
-    current_user: User = Depends(get_current_user),
-    link_service: LinkService = Depends(Provide[Container.link_service])
+    current_user: UserIdentity = Depends(get_current_identity),
+    link_service: LinkService = Depends(get_link_service)
 ):
     """Kullanıcının link analytics verilerini getirir"""
     analytics = await link_service.get_user_analytics(current_user.id)
-    return SuccessResponse.create(
-        data=analytics,
-        message="Analytics retrieved successfully"
-    )
+    return ORJSONResponse({
+        "status": STATUS_SUCCESS,
+        "message": MSG_ANALYTICS_RETRIEVED,
+        "data": analytics
+    })
 
 
 # Public endpoint - Link tıklandığında click count artırır
-@router.post("/{link_id}/click", response_model=SuccessResponse[dict])
-@inject
+@router.post("/{link_id}/click", response_class=ORJSONResponse, responses={200: {"model": SuccessResponse[dict]}})
 async def click_link(
     link_id: int,
-    link_service: LinkService = Depends(Provide[Container.link_service])
+    link_service: LinkService = Depends(get_link_service)
 ):
     """Link tıklanma sayısını artırır ve redirect URL'sini döndürür"""
-    link = await link_service.increment_click_count(link_id)
-    return SuccessResponse.create(
-        data={"redirect_url": link.url},
-        message="Click recorded successfully"
-    )
+    # Sayaç arka planda toplu yazılır, istek veritabanı yazmasını beklemez
+    redirect_url = await link_service.record_click(link_id)
+    return ORJSONResponse({
+        "status": STATUS_SUCCESS,
+        "message": MSG_CLICK_RECORDED,
+        "data": {"redirect_url": redirect_url}
+    })
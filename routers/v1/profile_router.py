@@ -1,11 +1,21 @@
 # routers/v1/profile_router.py
 
-from fastapi import APIRouter, Depends
-from dependency_injector.wiring import inject, Provide
-
+from fastapi import APIRouter, Depends, Request, Response, status
+
+from core.schemas.messages import (
+    MSG_ONBOARDING_COMPLETED,
+    MSG_ONBOARDING_SKIPPED,
+    MSG_ONBOARDING_STATUS_RETRIEVED,
+    MSG_PROFILE_RETRIEVED,
+    MSG_PROFILE_STEP_1_COMPLETED,
+    MSG_PROFILE_STEP_2_COMPLETED,
+    MSG_PROFILE_STEP_3_COMPLETED,
+    MSG_PROFILE_STEP_4_COMPLETED,
+    MSG_PROFILE_UPDATED,
+)
 from core.schemas.response import SuccessResponse
-from deps import get_current_user
-from di.container import Container
+from core.utils.etag import etag_matches, make_etag
+from deps import get_current_user, get_user_service
 from models import User
 from services.user.user_service import UserService
 from services.user.user_service_dto import (
@@ -20,206 +30,172 @@ from services.user.user_service_dto import (
 
 router = APIRouter(prefix="/profile", tags=["profile"])
 
+# Onboarding adım başlıkları (index = adım numarası) ve tamamlanan-adım bitmask'i -> adım listesi tablosu
+_STEP_TITLES = ("", "Complete Your Profile", "Set Up Your Page", "Add Social Links", "Customize Appearance",
+                "Add Your First Links")
+_COMPLETED_STEPS = tuple(tuple(step for step in range(1, 5) if mask >> (step - 1) & 1) for mask in range(16))
 
-@router.get("/me", response_model=SuccessResponse[UserRead])
-async def get_my_profile(current_user: User = Depends(get_current_user)):
+
+@router.get("/me", response_model=SuccessResponse[UserRead], responses={304: {"description": "Not Modified"}})
+async def get_my_profile(request: Request, response: Response, current_user: User = Depends(get_current_user)):
     """Get current user profile"""
-    return SuccessResponse.create(
+    # Profil değişmediyse serileştirme yapılmadan 304 döner
+    etag = make_etag(current_user.id, current_user.updated_at)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    return SuccessResponse.model_construct(
         data=current_user,
-        message="Profile retrieved successfully"
+        message=MSG_PROFILE_RETRIEVED
     )
 
 
 @router.get("/onboarding-status", response_model=SuccessResponse[OnboardingStatus])
-async def get_onboarding_status(current_user: User = Depends(get_current_user)):
+async def get_onboarding_status(
+        current_user: User = Depends(get_current_user),
+        user_service: UserService = Depends(get_user_service)
+):
     """Get user's onboarding status"""
 
-    # Determine completed steps
-    completed_steps = []
-    next_step = 1
-
-    # Step 1: Basic info
-    if current_user.display_name or current_user.bio or current_user.profile_image_url:
-        completed_steps.append(1)
-        next_step = 2
-
-    # Step 2: Page settings
-    if current_user.page_title or current_user.website:
-        completed_steps.append(2)
-        next_step = 3
-
-    # Step 3: Social media
-    if current_user.twitter_username or current_user.instagram_username or current_user.linkedin_username:
-        completed_steps.append(3)
-        next_step = 4
-
-    # Step 4: Theme
-    if current_user.theme_color != "#1383eb" or current_user.background_type != "color":
-        completed_steps.append(4)
-        next_step = 5  # Completed
-
-    # Define step titles
-    step_titles = {
-        1: "Complete Your Profile",
-        2: "Set Up Your Page",
-        3: "Add Social Links",
-        4: "Customize Appearance",
-        5: "Add Your First Links"
-    }
+    # Her tamamlanan adım bir bit: step 1 -> bit 0 ... step 4 -> bit 3
+    mask = (
+        bool(current_user.display_name or current_user.bio or current_user.profile_image_url)  # Basic info
+        | bool(current_user.page_title or current_user.website) << 1  # Page settings
+        | bool(
+            current_user.twitter_username or current_user.instagram_username or current_user.linkedin_username
+        ) << 2  # Social media
+        | (current_user.theme_color != "#1383eb" or current_user.background_type != "color") << 3  # Theme
+    )
+    # Sıradaki adım, tamamlanan en yüksek adımın bir sonrası (hiçbiri yoksa 1, hepsi bittiyse 5)
+    next_step = mask.bit_length() + 1
+
+    # profile_completion_percentage için link varlığını tek bir EXISTS sorgusuyla yükle
+    await user_service.load_has_any_link(current_user)
 
     status = OnboardingStatus(
         step=next_step,
-        completed_steps=completed_steps,
+        completed_steps=_COMPLETED_STEPS[mask],
         profile_completion_percentage=current_user.profile_completion_percentage,
-        next_step_title=step_titles.get(next_step),
+        next_step_title=_STEP_TITLES[next_step],
         can_skip=True
     )
 
-    return SuccessResponse.create(
+    return SuccessResponse.model_construct(
         data=status,
-        message="Onboarding status retrieved"
+        message=MSG_ONBOARDING_STATUS_RETRIEVED
     )
 
 
 @router.post("/complete-step-1", response_model=SuccessResponse[UserRead])
-@inject
 async def complete_profile_step_1(
         profile_data: ProfileCompletionStep1,
         current_user: User = Depends(get_current_user),
-        user_service: UserService = Depends(Provide[Container.user_service])
+        user_service: UserService = Depends(get_user_service)
 ):
     """Complete profile step 1: Basic profile info"""
 
-    # Update user with new data
-    update_data = profile_data.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(current_user, key, value)
+    # Sadece gönderilen kolonlar tek bir UPDATE ... RETURNING ile yazılır
+    updated_user = await user_service.patch_user(current_user, profile_data.model_dump(exclude_unset=True))
 
-    updated_user = await user_service.update_user(current_user)
-
-    return SuccessResponse.create(
+    return SuccessResponse.model_construct(
         data=updated_user,
-        message="Profile step 1 completed successfully"
+        message=MSG_PROFILE_STEP_1_COMPLETED
     )
 
 
 @router.post("/complete-step-2", response_model=SuccessResponse[UserRead])
-@inject
 async def complete_profile_step_2(
         profile_data: ProfileCompletionStep2,
         current_user: User = Depends(get_current_user),
-        user_service: UserService = Depends(Provide[Container.user_service])
+        user_service: UserService = Depends(get_user_service)
 ):
     """Complete profile step 2: Page settings"""
 
-    update_data = profile_data.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(current_user, key, value)
-
-    updated_user = await user_service.update_user(current_user)
+    updated_user = await user_service.patch_user(current_user, profile_data.model_dump(exclude_unset=True))
 
-    return SuccessResponse.create(
+    return SuccessResponse.model_construct(
         data=updated_user,
-        message="Profile step 2 completed successfully"
+        message=MSG_PROFILE_STEP_2_COMPLETED
     )
 
 
 @router.post("/complete-step-3", response_model=SuccessResponse[UserRead])
-@inject
 async def complete_profile_step_3(
         profile_data: ProfileCompletionStep3,
         current_user: User = Depends(get_current_user),
-        user_service: UserService = Depends(Provide[Container.user_service])
+        user_service: UserService = Depends(get_user_service)
 ):
     """Complete profile step 3: Social media links"""
 
-    update_data = profile_data.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(current_user, key, value)
+    updated_user = await user_service.patch_user(current_user, profile_data.model_dump(exclude_unset=True))
 
-    updated_user = await user_service.update_user(current_user)
-
-    return SuccessResponse.create(
+    return SuccessResponse.model_construct(
         data=updated_user,
-        message="Profile step 3 completed successfully"
+        message=MSG_PROFILE_STEP_3_COMPLETED
     )
 
 
 @router.post("/complete-step-4", response_model=SuccessResponse[UserRead])
-@inject
 async def complete_profile_step_4(
         profile_data: ProfileCompletionStep4,
         current_user: User = Depends(get_current_user),
-        user_service: UserService = Depends(Provide[Container.user_service])
+        user_service: UserService = Depends(get_user_service)
 ):
     """Complete profile step 4: Theme & appearance"""
 
-    update_data = profile_data.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(current_user, key, value)
-
-    updated_user = await user_service.update_user(current_user)
+    updated_user = await user_service.patch_user(current_user, profile_data.model_dump(exclude_unset=True))
 
-    return SuccessResponse.create(
+    return SuccessResponse.model_construct(
         data=updated_user,
-        message="Profile step 4 completed successfully"
+        message=MSG_PROFILE_STEP_4_COMPLETED
     )
 
 
 @router.post("/complete-onboarding", response_model=SuccessResponse[UserRead])
-@inject
 async def complete_onboarding(
         current_user: User = Depends(get_current_user),
-        user_service: UserService = Depends(Provide[Container.user_service])
+        user_service: UserService = Depends(get_user_service)
 ):
     """Mark onboarding as completed"""
 
-    current_user.onboarding_completed = True
-    current_user.profile_completed = True
-
-    updated_user = await user_service.update_user(current_user)
+    updated_user = await user_service.patch_user(
+        current_user, {"onboarding_completed": True, "profile_completed": True}
+    )
 
-    return SuccessResponse.create(
+    return SuccessResponse.model_construct(
         data=updated_user,
-        message="Onboarding completed successfully! Welcome to LinkYoSelf!"
+        message=MSG_ONBOARDING_COMPLETED
     )
 
 
 @router.put("/update", response_model=SuccessResponse[UserRead])
-@inject
 async def update_profile(
         profile_data: UserProfileUpdate,
         current_user: User = Depends(get_current_user),
-        user_service: UserService = Depends(Provide[Container.user_service])
+        user_service: UserService = Depends(get_user_service)
 ):
     """Update user profile (complete update)"""
 
-    update_data = profile_data.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(current_user, key, value)
+    updated_user = await user_service.patch_user(current_user, profile_data.model_dump(exclude_unset=True))
 
-    updated_user = await user_service.update_user(current_user)
-
-    return SuccessResponse.create(
+    return SuccessResponse.model_construct(
         data=updated_user,
-        message="Profile updated successfully"
+        message=MSG_PROFILE_UPDATED
     )
 
 
 @router.post("/skip-onboarding", response_model=SuccessResponse[UserRead])
-@inject
 async def skip_onboarding(
         current_user: User = Depends(get_current_user),
-        user_service: UserService = Depends(Provide[Container.user_service])
+        user_service: UserService = Depends(get_user_service)
 ):
     """Skip onboarding process"""
 
-    current_user.onboarding_completed = True
     # profile_completed stays False
+    updated_user = await user_service.patch_user(current_user, {"onboarding_completed": True})
 
-    updated_user = await user_service.update_user(current_user)
-
-    return SuccessResponse.create(
+    return SuccessResponse.model_construct(
         data=updated_user,
-        message="Onboarding skipped. You can complete your profile later!"
+        message=MSG_ONBOARDING_SKIPPED
     )
\ No newline at end of file
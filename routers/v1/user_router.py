@@ -1,39 +1,46 @@
 from fastapi import APIRouter, Depends
-from dependency_injector.wiring import Provide, inject
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
 from typing import List
 
-from deps import get_current_user, get_current_admin_user
-from di.container import Container
+from deps import get_current_admin_user, get_current_user, get_user_service
 from services.user.user_service_dto import UserRead
-from core.schemas.response import BaseResponseModel
+from core.schemas.response import STATUS_SUCCESS, BaseResponseModel
 from core.exceptions import NotFoundException
 
 router = APIRouter(tags=["users"])
 
-@router.get("/", response_model=BaseResponseModel[List[UserRead]])
-@inject
+# Liste tek bir serileştirme geçişiyle JSON'a hazır hale getirilir (doğrulama yok)
+_USER_LIST_ADAPTER = TypeAdapter(List[UserRead])
+
+
+@router.get(
+    "/",
+    response_class=ORJSONResponse,
+    responses={200: {"model": BaseResponseModel[List[UserRead]]}},
+)
 async def list_users(
     current_user=Depends(get_current_admin_user),
-    service=Depends(Provide[Container.user_service])
+    service=Depends(get_user_service)
 ):
-    users = await service.list_users()
-    return BaseResponseModel(
-        data=users,
-        message="Users retrieved successfully"
-    )
+    users = await service.list_users_read()
+    return ORJSONResponse({
+        "status": STATUS_SUCCESS,
+        "message": "Users retrieved successfully",
+        "data": _USER_LIST_ADAPTER.dump_python(users, mode="json")
+    })
 
 
 @router.get("/{user_id}", response_model=BaseResponseModel[UserRead])
-@inject
 async def get_user(
     user_id: int,
     current_user=Depends(get_current_user),
-    service=Depends(Provide[Container.user_service])
+    service=Depends(get_user_service)
 ):
     user = await service.get_user(user_id)
     if not user:
         raise NotFoundException(f"User not found: {user_id}")
-    return BaseResponseModel(
+    return BaseResponseModel.model_construct(
         data=user,
         message="User retrieved successfully"
     )
@@ -41,9 +48,8 @@ async def get_user(
 
 @router.get('/me', response_model=BaseResponseModel[UserRead])
 async def read_users_me(current_user=Depends(get_current_user)):
-    # SQLAlchemy modeli direkt döndürmek yerine, Pydantic modeline dönüştürerek döndürüyoruz
-    user_data = UserRead.model_validate(current_user)
-    return BaseResponseModel(
-        data=user_data,
+    # Zarf doğrulanmadan kurulur; ORM nesnesi response_model tarafından tek geçişte UserRead'e dönüştürülür
+    return BaseResponseModel.model_construct(
+        data=current_user,
         message="User profile retrieved successfully"
     )
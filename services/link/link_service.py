@@ -1,26 +1,57 @@
 # services/link/link_service.py
 
-from typing import List
+import asyncio
+import contextvars
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from core.base_service import BaseService
-from core.exceptions import NotFoundException, PermissionDeniedException
+from core.exceptions import AlreadyExistsException, NotFoundException, PermissionDeniedException
 from models import Link
 from repositories.link.link_repository import LinkRepository
-from services.link.link_service_dto import LinkCreate, LinkUpdate, LinkReorderRequest
+from services.link.link_service_dto import LinkBulkCreate, LinkCreate, LinkUpdate, LinkReorderRequest
+
+logger = logging.getLogger(__name__)
 
 
 class LinkService(BaseService):
+    # Tıklamalar bellekte biriktirilir (link_id -> bekleyen artış) ve arka planda toplu yazılır.
+    # Süreç çökerse son flush aralığındaki tıklamalar kaybolabilir; sayaç için kabul edilebilir.
+    _pending_clicks: Dict[int, int] = {}
+    _click_flush_interval: float = 0.25
+    _click_flush_task: Optional[asyncio.Task] = None
+    # Yönlendirme URL'leri (link_id -> (son geçerlilik, url)); sıcak linkler veritabanına hiç gitmez
+    _click_urls: "OrderedDict[int, Tuple[float, str]]" = OrderedDict()
+    _click_urls_size: int = 10_000
+    _click_urls_ttl: float = 30.0
+    # Link sahipleri (link_id -> (son geçerlilik, user_id)); bir linkin sahibi değişmez, id'ler tekrar kullanılmaz.
+    # Başka kullanıcıya ait olduğu bilinen linklerde 403 veritabanına gitmeden döner.
+    _link_owners: "OrderedDict[int, Tuple[float, int]]" = OrderedDict()
+    _link_owners_size: int = 10_000
+    _link_owners_ttl: float = 300.0
+
     def __init__(self, link_repo: LinkRepository):
         super().__init__(link_repo)
         self.repository = link_repo
 
-    async def create_link(self, user_id: int, link_data: LinkCreate) -> Link:
-        """Kullanıcı için yeni link oluşturur"""
-        # Yeni linkin sıra numarasını belirle (son sıra + 1)
-        max_order = await self.repository.get_max_order_for_user(user_id)
-        order_index = (max_order or 0) + 1
+    def _remember_owner(self, link_id: int, user_id: int) -> None:
+        self._link_owners[link_id] = (time.monotonic() + self._link_owners_ttl, user_id)
+        self._link_owners.move_to_end(link_id)
+        if len(self._link_owners) > self._link_owners_size:
+            self._link_owners.popitem(last=False)
+
+    def _check_cached_owner(self, link_id: int, user_id: int) -> None:
+        """Önbellekte başka bir kullanıcıya ait görünen link için sorgu yapmadan 403 fırlatır"""
+        cached = self._link_owners.get(link_id)
+        if cached is not None and cached[0] > time.monotonic() and cached[1] != user_id:
+            raise PermissionDeniedException("You don't have permission to access this link")
 
-        link = Link(
+    @staticmethod
+    def _build_link(user_id: int, link_data: LinkCreate) -> Link:
+        return Link(
             user_id=user_id,
             title=link_data.title,
             url=link_data.url,
@@ -30,92 +61,169 @@ class LinkService(BaseService):
             text_color=link_data.text_color,
             border_radius=link_data.border_radius or 8,
             is_active=link_data.is_active if link_data.is_active is not None else True,
-            order_index=order_index
         )
 
-        return await self.repository.create_link(link)
+    async def create_link(self, user_id: int, link_data: LinkCreate) -> Link:
+        """Kullanıcı için yeni link oluşturur"""
+        link = self._build_link(user_id, link_data)
+
+        # Sıra numarası (son sıra + 1) ve URL tekilliği tek bir INSERT içinde çözülür
+        created_link = await self.repository.create_link_at_end(link)
+        if created_link is None:
+            raise AlreadyExistsException(detail=f"This URL already exists in your links: {link_data.url}")
+        self._remember_owner(created_link.id, user_id)
+        return created_link
+
+    async def import_links(self, user_id: int, bulk_data: LinkBulkCreate) -> List[Link]:
+        """Birden çok linki tek seferde ekler; kullanıcıda zaten olan URL'ler atlanır"""
+        links = [self._build_link(user_id, link_data) for link_data in bulk_data.links]
+        return await self.repository.create_many(links)
+
+    async def get_user_links(self, user_id: int, include_inactive: bool = False) -> List[Dict[str, Any]]:
+        """Kullanıcının linklerini sıralı şekilde, yanıta hazır dict'ler olarak getirir (LinkRead alanları)"""
+        return await self.repository.get_links_by_user_dicts(user_id, include_inactive)
+
+    async def get_links_version(self, user_id: int) -> Tuple[int, Optional[datetime]]:
+        """Kullanıcının link listesinin sürümü (sayı, son güncelleme); liste yüklenmeden"""
+        return await self.repository.get_links_version(user_id)
 
-    async def get_user_links(self, user_id: int, include_inactive: bool = False) -> List[Link]:
-        """Kullanıcının linklerini sıralı şekilde getirir"""
-        return await self.repository.get_links_by_user(user_id, include_inactive)
+    async def iter_user_links(self, user_id: int, include_inactive: bool = False) -> AsyncIterator[Link]:
+        """Kullanıcının linklerini tümünü belleğe almadan, sıralı şekilde akıtır"""
+        async for link in self.repository.iter_links_by_user(user_id, include_inactive):
+            yield link
 
     async def get_link_by_id(self, link_id: int, user_id: int) -> Link:
         """Link ID'si ile link getirir ve kullanıcı yetkisini kontrol eder"""
+        self._check_cached_owner(link_id, user_id)
         link = await self.repository.get_by_id(link_id)
         if not link:
             raise NotFoundException(f"Link not found: {link_id}")
 
+        self._remember_owner(link_id, link.user_id)
         if link.user_id != user_id:
             raise PermissionDeniedException("You don't have permission to access this link")
 
         return link
 
+    async def _raise_missing_or_forbidden(self, link_id: int) -> None:
+        """Sahiplik koşullu yazma satır döndürmediğinde 404 ile 403'ü ayırt eder (sadece hata yolunda)"""
+        self._link_owners.pop(link_id, None)
+        if await self.repository.link_exists(link_id):
+            raise PermissionDeniedException("You don't have permission to access this link")
+        raise NotFoundException(f"Link not found: {link_id}")
+
     async def update_link(self, link_id: int, user_id: int, link_data: LinkUpdate) -> Link:
         """Link günceller, kullanıcı yetkisini kontrol eder"""
-        link = await self.get_link_by_id(link_id, user_id)
-
-        # Sadece None olmayan alanları güncelle
+        # Sadece gönderilen alanlar güncellenir
         update_data = link_data.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(link, key, value)
-
-        return await self.repository.update_link(link)
+        if not update_data:
+            return await self.get_link_by_id(link_id, user_id)
+
+        # Sahiplik kontrolü ve güncelleme tek bir UPDATE ... WHERE id AND user_id RETURNING ile
+        self._check_cached_owner(link_id, user_id)
+        link = await self.repository.update_owned(link_id, user_id, update_data)
+        if link is None:
+            await self._raise_missing_or_forbidden(link_id)
+        self._click_urls.pop(link_id, None)
+        return link
 
     async def delete_link(self, link_id: int, user_id: int) -> None:
         """Link siler, kullanıcı yetkisini kontrol eder"""
-        link = await self.get_link_by_id(link_id, user_id)
-        await self.repository.delete_link(link)
+        self._check_cached_owner(link_id, user_id)
+        if not await self.repository.delete_owned(link_id, user_id):
+            await self._raise_missing_or_forbidden(link_id)
+        self._click_urls.pop(link_id, None)
+        self._link_owners.pop(link_id, None)
 
     async def reorder_links(self, user_id: int, reorder_data: LinkReorderRequest) -> List[Link]:
         """Kullanıcının linklerini yeniden sıralar"""
-        # Kullanıcının tüm linklerinin bu listede olduğunu kontrol et
-        user_links = await self.repository.get_links_by_user(user_id, include_inactive=True)
-        user_link_ids = {link.id for link in user_links}
-        request_link_ids = set(reorder_data.link_ids)
+        # Kullanıcının tüm linklerinin bu listede olduğunu kontrol et (sadece id'ler okunur)
+        user_link_ids = await self.repository.get_link_ids_by_user(user_id)
 
-        if user_link_ids != request_link_ids:
+        # İstekteki id kümesi doğrulama sırasında kurulmuştu
+        if user_link_ids != reorder_data._id_set:
             raise PermissionDeniedException("Invalid link IDs provided")
 
-        # Sıralamayı güncelle
-        await self.repository.update_link_orders(user_id, reorder_data.link_ids)
-
-        # Güncellenmiş linkleri döndür
-        return await self.repository.get_links_by_user(user_id, include_inactive=True)
-
-    async def increment_click_count(self, link_id: int) -> Link:
-        """Link tıklanma sayısını artırır (Analytics için)"""
-        link = await self.repository.get_by_id(link_id)
-        if not link:
-            raise NotFoundException(f"Link not found: {link_id}")
-
-        link.click_count += 1
-        return await self.repository.update_link(link)
+        # Sıralamayı güncelle; güncellenmiş linkler aynı UPDATE'in RETURNING'inden gelir
+        return await self.repository.reorder_and_return(user_id, reorder_data.link_ids)
+
+    async def record_click(self, link_id: int) -> str:
+        """
+        Tıklamayı bellekte sayar ve yönlendirme URL'sini döner; sayaç veritabanına
+        _click_flush_interval aralıklarla tek bir toplu UPDATE ile yazılır.
+        """
+        cached = self._click_urls.get(link_id)
+        if cached is not None and cached[0] > time.monotonic():
+            url = cached[1]
+        else:
+            url = await self.repository.get_link_url(link_id)
+            if url is None:
+                self._click_urls.pop(link_id, None)
+                raise NotFoundException(f"Link not found: {link_id}")
+            self._click_urls[link_id] = (time.monotonic() + self._click_urls_ttl, url)
+            self._click_urls.move_to_end(link_id)
+            if len(self._click_urls) > self._click_urls_size:
+                self._click_urls.popitem(last=False)
+
+        self._pending_clicks[link_id] = self._pending_clicks.get(link_id, 0) + 1
+        self._ensure_click_flusher()
+        return url
+
+    def _ensure_click_flusher(self) -> None:
+        task = LinkService._click_flush_task
+        if task is None or task.done():
+            # Boş context: flusher isteğin session'ını (ContextVar) devralmaz, kendi session'larını açar
+            LinkService._click_flush_task = asyncio.create_task(
+                self._flush_clicks_forever(), context=contextvars.Context()
+            )
+
+    async def _flush_clicks_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self._click_flush_interval)
+            await self.flush_clicks()
+
+    async def flush_clicks(self) -> None:
+        """Bekleyen tıklamaları tek bir UPDATE ile yazar; hata olursa sayılar bir sonraki flush'a kalır"""
+        if not self._pending_clicks:
+            return
+        deltas = dict(self._pending_clicks)
+        self._pending_clicks.clear()
+        try:
+            await self.repository.add_click_counts(deltas)
+        except Exception:
+            logger.exception("Failed to flush %d pending click counts", len(deltas))
+            for link_id, delta in deltas.items():
+                self._pending_clicks[link_id] = self._pending_clicks.get(link_id, 0) + delta
+
+    async def close_click_buffer(self) -> None:
+        """Flusher'ı durdurur ve kalan tıklamaları yazar (uygulama kapanırken)"""
+        task = LinkService._click_flush_task
+        LinkService._click_flush_task = None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.flush_clicks()
 
     async def get_user_analytics(self, user_id: int) -> dict:
         """Kullanıcının link analytics verilerini getirir"""
-        links = await self.repository.get_links_by_user(user_id, include_inactive=True)
-
-        total_clicks = sum(link.click_count for link in links)
-        active_links = len([link for link in links if link.is_active])
+        # Toplamlar ve sıralama veritabanında yapılır; linkler ORM nesnesi olarak yüklenmez
+        total_links, active_links, total_clicks = await self.repository.analytics_for_user(user_id)
+        rows = await self.repository.list_for_analytics(user_id)
 
         return {
-            "total_links": len(links),
+            "total_links": total_links,
             "active_links": active_links,
             "total_clicks": total_clicks,
-            "links": [
-                {
-                    "id": link.id,
-                    "title": link.title,
-                    "url": link.url,
-                    "click_count": link.click_count,
-                    "is_active": link.is_active
-                }
-                for link in sorted(links, key=lambda x: x.click_count, reverse=True)
-            ]
+            "links": [dict(row._mapping) for row in rows]
         }
 
     async def toggle_link_status(self, link_id: int, user_id: int) -> Link:
         """Link'in aktif/pasif durumunu değiştirir"""
-        link = await self.get_link_by_id(link_id, user_id)
-        link.is_active = not link.is_active
-        return await self.repository.update_link(link)
\ No newline at end of file
+        self._check_cached_owner(link_id, user_id)
+        link = await self.repository.toggle_active_owned(link_id, user_id)
+        if link is None:
+            await self._raise_missing_or_forbidden(link_id)
+        return link
\ No newline at end of file
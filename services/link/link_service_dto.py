@@ -1,6 +1,78 @@
-from pydantic import BaseModel, Field, field_validator
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_validator, model_validator
 from typing import Optional
-import re
+from urllib.parse import urlsplit
+
+from core.utils.validators import is_hex_color
+
+# Kabul edilen URL şemaları
+_URL_SCHEMES: tuple[str, str] = ('http://', 'https://')
+# Alan adı etiketlerinde izin verilen karakterler (hostname urlsplit tarafından küçük harfe çevrilir)
+_LABEL_CHARS = frozenset('abcdefghijklmnopqrstuvwxyz0123456789-')
+
+
+def _is_ipv4(host: str) -> bool:
+    """Dört noktalı 1-3 haneli sayı grubu (eski regex'teki IP kuralı)"""
+    octets = host.split('.')
+    return len(octets) == 4 and all(0 < len(octet) <= 3 and octet.isdigit() for octet in octets)
+
+
+def _is_domain(host: str) -> bool:
+    """
+    Eski regex'teki alan adı kuralı: harf/rakam/tire etiketleri (tire başta/sonda olamaz, en fazla 63 karakter)
+    ve 2-6 harfli bir TLD; sondaki nokta kabul edilir.
+    """
+    labels = (host[:-1] if host.endswith('.') else host).split('.')
+    tld = labels.pop()
+    if not labels or not 2 <= len(tld) <= 6 or not tld.isalpha():
+        return False
+    return all(
+        0 < len(label) <= 63 and label[0] != '-' and label[-1] != '-' and _LABEL_CHARS.issuperset(label)
+        for label in labels
+    )
+
+
+# LinkCreate ve LinkUpdate validator'ları modül seviyesinde bir kez tanımlanır ve iki modele de bağlanır
+def _validate_url(url: Optional[str]) -> Optional[str]:
+    """
+    Eksikse https:// ekler ve URL yapısını kontrol eder. Regex yerine urlsplit ile ayrıştırılır;
+    geri izleme (backtracking) olmadığı için uzun/kötü niyetli URL'lerde de süre doğrusal kalır.
+    """
+    if url is None:
+        return url
+    if not url.startswith(_URL_SCHEMES):
+        url = 'https://' + url
+
+    # Boşluk/kontrol karakteri içeren URL'ler reddedilir
+    if ' ' in url or not url.isprintable():
+        raise ValueError("Invalid URL format")
+
+    parts = urlsplit(url)
+    # Kullanıcı bilgisi (https://google.com@evil.com gibi) kabul edilmez
+    if parts.username is not None or parts.password is not None:
+        raise ValueError("Invalid URL format")
+    # hostname küçük harfe çevrilmiş host; port geçersizse .port ValueError fırlatır
+    host = parts.hostname
+    if not host or not host.isascii() or parts.port == 0:
+        raise ValueError("Invalid URL format")
+    # Alan adı, localhost veya IPv4 adresi beklenir
+    if host != 'localhost' and not _is_ipv4(host) and not _is_domain(host):
+        raise ValueError("Invalid URL format")
+
+    return url
+
+
+def _validate_color(color: Optional[str]) -> Optional[str]:
+    """Hex renk kodu (#RRGGBB) kontrolü"""
+    if color is None:
+        return color
+
+    if not is_hex_color(color):
+        raise ValueError("Color must be a valid hex code (e.g., #FF5733)")
+
+    return color
+
 
 class LinkCreate(BaseModel):
     title: str = Field(..., min_length=1, max_length=255, description="Link title")
@@ -12,38 +84,8 @@ class LinkCreate(BaseModel):
     border_radius: Optional[int] = Field(8, ge=0, le=50, description="Border radius in pixels")
     is_active: Optional[bool] = Field(True, description="Whether the link is active")
 
-    @field_validator("url", mode="before")
-    @classmethod
-    def validate_url(cls, url: str) -> str:
-        # URL formatını kontrol et
-        if not url.startswith(('http://', 'https://')):
-            url = 'https://' + url
-
-        # Basit URL regex kontrolü
-        url_pattern = re.compile(
-            r'^https?://'  # http:// veya https://
-            r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain
-            r'localhost|'  # localhost
-            r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # IP
-            r'(?::\d+)?'  # optional port
-            r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-
-        if not url_pattern.match(url):
-            raise ValueError("Invalid URL format")
-
-        return url
-
-    @field_validator("background_color", "text_color", mode="before")
-    @classmethod
-    def validate_color(cls, color: Optional[str]) -> Optional[str]:
-        if color is None:
-            return color
-
-        # Hex renk kodu kontrolü
-        if not re.match(r'^#[0-9A-Fa-f]{6}$', color):
-            raise ValueError("Color must be a valid hex code (e.g., #FF5733)")
-
-        return color
+    _v_url = field_validator("url", mode="before")(_validate_url)
+    _v_color = field_validator("background_color", "text_color", mode="before")(_validate_color)
 
 
 class LinkUpdate(BaseModel):
@@ -56,38 +98,8 @@ class LinkUpdate(BaseModel):
     border_radius: Optional[int] = Field(None, ge=0, le=50)
     is_active: Optional[bool] = None
 
-    @field_validator("url", mode="before")
-    @classmethod
-    def validate_url(cls, url: Optional[str]) -> Optional[str]:
-        if url is None:
-            return url
-
-        if not url.startswith(('http://', 'https://')):
-            url = 'https://' + url
-
-        url_pattern = re.compile(
-            r'^https?://'
-            r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'
-            r'localhost|'
-            r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'
-            r'(?::\d+)?'
-            r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-
-        if not url_pattern.match(url):
-            raise ValueError("Invalid URL format")
-
-        return url
-
-    @field_validator("background_color", "text_color", mode="before")
-    @classmethod
-    def validate_color(cls, color: Optional[str]) -> Optional[str]:
-        if color is None:
-            return color
-
-        if not re.match(r'^#[0-9A-Fa-f]{6}$', color):
-            raise ValueError("Color must be a valid hex code (e.g., #FF5733)")
-
-        return color
+    _v_url = field_validator("url", mode="before")(_validate_url)
+    _v_color = field_validator("background_color", "text_color", mode="before")(_validate_color)
 
 
 class LinkRead(BaseModel):
@@ -103,34 +115,49 @@ class LinkRead(BaseModel):
     is_active: bool = True
     click_count: int = 0
     order_index: int = 0
-    created_at: str
-    updated_at: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
 
-    class Config:
-        from_attributes = True
+
+class LinkBulkCreate(BaseModel):
+    links: list[LinkCreate] = Field(..., min_length=1, max_length=1000, description="Links to import")
 
 
 class LinkReorderRequest(BaseModel):
     link_ids: list[int] = Field(..., description="Ordered list of link IDs")
 
+    # Doğrulamada bir kez kurulan id kümesi; LinkService.reorder_links tekrar set() kurmaz
+    _id_set: frozenset[int] = PrivateAttr(default=frozenset())
+
     @field_validator("link_ids")
     @classmethod
     def validate_link_ids(cls, link_ids: list[int]) -> list[int]:
-        if len(link_ids) == 0:
+        n = len(link_ids)
+        if n == 0:
             raise ValueError("Link IDs list cannot be empty")
 
-        if len(link_ids) != len(set(link_ids)):
-            raise ValueError("Duplicate link IDs are not allowed")
+        # Hash'lemeden önce üst sınır; büyük istek gövdelerine karşı koruma
+        if n > 1000:
+            raise ValueError("Too many links")
 
         return link_ids
 
+    @model_validator(mode="after")
+    def validate_unique_link_ids(self) -> "LinkReorderRequest":
+        id_set = frozenset(self.link_ids)
+        if len(id_set) != len(self.link_ids):
+            raise ValueError("Duplicate link IDs are not allowed")
+        self._id_set = id_set
+        return self
+
 
 class LinkAnalytics(BaseModel):
     link_id: int
     title: str
     url: str
     click_count: int
-    created_at: str
+    created_at: datetime
 
-    class Config:
-        from_attributes = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
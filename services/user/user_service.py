@@ -1,15 +1,63 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
 from core.base_service import BaseService
 from models import User
 from repositories.user.user_repository import UserRepository
+from services.user.user_service_dto import UserRead
+
+# users.profile_completion'ı etkileyen kolonlar; sosyal hesaplar tek alan sayılır
+_SOCIAL_FIELDS = ("twitter_username", "instagram_username", "linkedin_username")
+_COMPLETION_FIELDS = frozenset(
+    ("display_name", "bio", "profile_image_url", "website", "page_title", "page_description") + _SOCIAL_FIELDS
+)
+
+
+def _profile_completion(user: User, fields: Dict[str, Any]) -> int:
+    """Güncelleme sonrası değerlerle profil tamamlama yüzdesi (7 alan, tamsayı bölme)"""
+    def value(key: str) -> Any:
+        return fields[key] if key in fields else getattr(user, key)
+
+    completed_fields = (
+        bool(value("display_name"))
+        + bool(value("bio"))
+        + bool(value("profile_image_url"))
+        + bool(value("website"))
+        + any(value(key) for key in _SOCIAL_FIELDS)
+        + bool(value("page_title"))
+        + bool(value("page_description"))
+    )
+    return completed_fields * 100 // 7
+
+
+class UserIdentity(NamedTuple):
+    """Kimliği doğrulanmış kullanıcının değişmeyen alanları; sadece user id'ye ihtiyaç duyan endpoint'ler için"""
+    id: int
+    username: str
+    is_admin: bool
 
 
 class UserService(BaseService):
+    # Kimliği doğrulanmış kullanıcılar için kısa ömürlü önbellek: username -> (son geçerlilik, UserIdentity).
+    # Sadece kimlik alanları tutulur; parola hash'i ve profil kolonları asla önbelleğe alınmaz, profil gösteren
+    # endpoint'ler kullanıcıyı her istekte veritabanından okur. Önbellek süreç başınadır; is_admin değişikliği
+    # diğer worker'larda en geç TTL sonunda görünür.
+    _identity_cache: "OrderedDict[str, Tuple[float, UserIdentity]]" = OrderedDict()
+    _identity_cache_size: int = 10_000
+    _identity_cache_ttl: float = 30.0
+
     def __init__(self, user_repo: UserRepository):
         super().__init__(user_repo)
         self.repository = user_repo
 
     async def list_users(self):
-        return await self.list(User)
+        return await self.repository.list_users()
+
+    async def list_users_read(self) -> List[UserRead]:
+        """Kullanıcı listesi UserRead olarak; veri veritabanından geldiği için doğrulama yapılmaz (model_construct)"""
+        rows = await self.repository.list_user_rows()
+        return [UserRead.model_construct(**row) for row in rows]
 
     async def get_user(self, user_id: int):
         return await self.repository.get_by_id(user_id)
@@ -17,6 +65,32 @@ class UserService(BaseService):
     async def get_by_username(self, username: str):
         return await self.repository.get_by_username(username)
 
+    async def get_identity_cached(self, username: str) -> Optional[UserIdentity]:
+        """id/username/is_admin of a user, served from the in-process cache for a short TTL"""
+        cached = self._identity_cache.get(username)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                self._identity_cache.move_to_end(username)
+                return cached[1]
+            del self._identity_cache[username]
+
+        row = await self.repository.get_identity(username)
+        if row is None:
+            return None
+        identity = UserIdentity(*row)
+        self._identity_cache[username] = (time.monotonic() + self._identity_cache_ttl, identity)
+        if len(self._identity_cache) > self._identity_cache_size:
+            self._identity_cache.popitem(last=False)
+        return identity
+
+    async def load_has_any_link(self, user: User) -> User:
+        """Load the flag profile_completion_percentage needs, without loading the links"""
+        return await self.repository.load_has_any_link(user)
+
+    def invalidate_cached_user(self, username: str) -> None:
+        """Drop a user's identity from the in-process cache (after updates)"""
+        self._identity_cache.pop(username, None)
+
     async def get_by_email(self, email: str):
         return await self.repository.get_by_email(email)
 
@@ -25,7 +99,19 @@ class UserService(BaseService):
 
     async def update_user(self, user: User):
         """Update user information"""
-        return await self.repository.update(user)
+        updated_user = await self.repository.update(user)
+        self.invalidate_cached_user(user.username)
+        return updated_user
+
+    async def patch_user(self, user: User, fields: Dict[str, Any]) -> User:
+        """Update only the given columns in one statement, skipping the ORM dirty-attribute flush"""
+        if not fields:
+            return user
+        # Tamamlama yüzdesi yazma anında hesaplanır; okuma yanıtları kolonu olduğu gibi döner
+        if not _COMPLETION_FIELDS.isdisjoint(fields):
+            fields = {**fields, "profile_completion": _profile_completion(user, fields)}
+        updated_user = await self.repository.patch(user.id, fields)
+        return updated_user
 
     async def check_username_availability(self, username: str) -> bool:
         """Check if username is available"""
@@ -1,44 +1,65 @@
-from pydantic import BaseModel, EmailStr, Field, field_validator, computed_field
+from pydantic import AliasChoices, BaseModel, ConfigDict, EmailStr, Field, field_validator
 from typing import Optional
 from datetime import datetime
+import re
+import sys
+
+from core.utils.validators import is_hex_color
+
+# Kayıt doğrulamasında kullanılan sabitler modül yüklenirken bir kez kurulur
+# Only alphanumeric, dots, hyphens, underscores allowed
+# \Z: '$' sondaki bir satır sonunu ('bob\n') kabul eder
+_USERNAME_RE = re.compile(r'\A[a-zA-Z0-9_.-]+\Z')
+_RESERVED_USERNAMES: frozenset[str] = frozenset(
+    ('admin', 'api', 'www', 'mail', 'support', 'help', 'about', 'contact', 'blog', 'news')
+)
+
+# Profil doğrulamasında kullanılan desenler; büyük/küçük harf karakter sınıflarında (re.IGNORECASE yok)
+_URL_RE = re.compile(
+    r'\Ahttps?://'
+    r'(?:(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z]{2,6}\.?|'
+    r'localhost|'
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'
+    r'(?::\d+)?'
+    r'(?:/?|[/?]\S+)\Z')
+_URL_SCHEMES: tuple[str, str] = ('http://', 'https://')
+_BACKGROUND_TYPE_CHOICES = ('color', 'gradient', 'image')
+# Tema varsayılanları (User modelinin kolon varsayılanlarıyla aynı); Field'lar ve validator'lar aynı nesneyi döner
+_DEFAULT_THEME_COLOR = sys.intern("#1383eb")
+_DEFAULT_BG_TYPE = sys.intern("color")
+_DEFAULT_BG_VALUE = sys.intern("#ffffff")
+_BACKGROUND_TYPES: frozenset[str] = frozenset(_BACKGROUND_TYPE_CHOICES)
+_BACKGROUND_TYPES_MSG = f"Background type must be one of: {list(_BACKGROUND_TYPE_CHOICES)}"
 
 
 class UserCreateMinimal(BaseModel):
     """Minimal registration - sadece gerekli alanlar"""
     username: str = Field(..., min_length=3, max_length=30, description="Unique username for profile URL")
     email: EmailStr = Field(..., description="User email address")
+    # Uzunluk sınırları pydantic-core tarafından uygulanır
     password: str = Field(..., min_length=6, max_length=50, description="User password")
 
     @field_validator("username", mode="before")
     @classmethod
     def validate_username(cls, username: str) -> str:
         """Username validation"""
-        import re
-
-        # Only alphanumeric, dots, hyphens, underscores allowed
-        if not re.match(r'^[a-zA-Z0-9_.-]+', username):
+        if not _USERNAME_RE.match(username):
             raise ValueError("Username can only contain letters, numbers, dots, hyphens, and underscores")
 
         # Reserved usernames
-        reserved = ['admin', 'api', 'www', 'mail', 'support', 'help', 'about', 'contact', 'blog', 'news']
-        if username.lower() in reserved:
+        lowered = username.lower()
+        if lowered in _RESERVED_USERNAMES:
             raise ValueError("This username is reserved")
 
-        return username.lower()
+        return lowered
 
-    @field_validator("password", mode="before")
-    @classmethod
-    def validate_password(cls, password: str) -> str:
-        """Basic password validation"""
-        if len(password) < 6:
-            raise ValueError("Password must be at least 6 characters long")
-        if len(password) > 50:
-            raise ValueError("Password must be at most 50 characters long")
-        return password
 
+# Profil alan grupları (adım modelleri ve UserProfileUpdate bunlardan türer; alanlar ve validator'lar tek yerde).
+# defer_build: şema ilk kullanımda kurulur; tek bir endpoint'e ait modeller import sırasında derlenmez,
+# doğrudan hiç kullanılmayan bu taban sınıflar ise hiç derlenmez.
+class _BasicInfoFields(BaseModel):
+    model_config = ConfigDict(defer_build=True)
 
-class ProfileCompletionStep1(BaseModel):
-    """Step 1: Basic Profile Info"""
     first_name: Optional[str] = Field(None, max_length=50, description="First name")
     last_name: Optional[str] = Field(None, max_length=50, description="Last name")
     display_name: Optional[str] = Field(None, max_length=100, description="Display name on profile page")
@@ -46,8 +67,9 @@ class ProfileCompletionStep1(BaseModel):
     profile_image_url: Optional[str] = Field(None, max_length=500, description="Profile image URL")
 
 
-class ProfileCompletionStep2(BaseModel):
-    """Step 2: Page Settings"""
+class _PageFields(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     page_title: Optional[str] = Field(None, max_length=100, description="Custom page title")
     page_description: Optional[str] = Field(None, max_length=500, description="Page meta description")
     website: Optional[str] = Field(None, max_length=500, description="Personal/business website")
@@ -58,26 +80,18 @@ class ProfileCompletionStep2(BaseModel):
         if not website:
             return website
 
-        if not website.startswith(('http://', 'https://')):
+        if not website.startswith(_URL_SCHEMES):
             website = 'https://' + website
 
-        import re
-        url_pattern = re.compile(
-            r'^https?://'
-            r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'
-            r'localhost|'
-            r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'
-            r'(?::\d+)?'
-            r'(?:/?|[/?]\S+)', re.IGNORECASE)
-
-        if not url_pattern.match(website):
+        if not _URL_RE.match(website):
             raise ValueError("Invalid website URL")
 
         return website
 
 
-class ProfileCompletionStep3(BaseModel):
-    """Step 3: Social Media Links"""
+class _SocialFields(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     twitter_username: Optional[str] = Field(None, max_length=100, description="Twitter username (without @)")
     instagram_username: Optional[str] = Field(None, max_length=100, description="Instagram username (without @)")
     linkedin_username: Optional[str] = Field(None, max_length=100, description="LinkedIn username")
@@ -87,24 +101,40 @@ class ProfileCompletionStep3(BaseModel):
     def clean_username(cls, username: Optional[str]) -> Optional[str]:
         if not username:
             return username
-        # Remove @ symbol if present
-        return username.lstrip('@').strip()
+        # Remove @ symbol if present; "@ foo" ve " @foo " gibi boşluklu girişler de temizlenir
+        username = username.strip()
+        if username.startswith('@'):
+            return username.lstrip('@').strip()
+        return username
+
+
+class ProfileCompletionStep1(_BasicInfoFields):
+    """Step 1: Basic Profile Info"""
+
+
+class ProfileCompletionStep2(_PageFields):
+    """Step 2: Page Settings"""
+
+
+class ProfileCompletionStep3(_SocialFields):
+    """Step 3: Social Media Links"""
 
 
 class ProfileCompletionStep4(BaseModel):
     """Step 4: Theme & Appearance"""
-    theme_color: Optional[str] = Field("#1383eb", max_length=20, description="Primary theme color")
-    background_type: Optional[str] = Field("color", description="Background type: color, gradient, image")
-    background_value: Optional[str] = Field("#ffffff", max_length=500, description="Background color/image URL")
+    model_config = ConfigDict(defer_build=True)
+
+    theme_color: Optional[str] = Field(_DEFAULT_THEME_COLOR, max_length=20, description="Primary theme color")
+    background_type: Optional[str] = Field(_DEFAULT_BG_TYPE, description="Background type: color, gradient, image")
+    background_value: Optional[str] = Field(_DEFAULT_BG_VALUE, max_length=500, description="Background color/image URL")
 
     @field_validator("theme_color", mode="before")
     @classmethod
     def validate_color(cls, color: Optional[str]) -> Optional[str]:
         if not color:
-            return "#1383eb"  # Default color
+            return _DEFAULT_THEME_COLOR
 
-        import re
-        if not re.match(r'^#[0-9A-Fa-f]{6}', color):
+        if not is_hex_color(color):
             raise ValueError("Color must be a valid hex code (e.g., #FF5733)")
 
         return color
@@ -113,28 +143,17 @@ class ProfileCompletionStep4(BaseModel):
     @classmethod
     def validate_background_type(cls, bg_type: Optional[str]) -> Optional[str]:
         if not bg_type:
-            return "color"
+            return _DEFAULT_BG_TYPE
 
-        valid_types = ["color", "gradient", "image"]
-        if bg_type not in valid_types:
-            raise ValueError(f"Background type must be one of: {valid_types}")
+        if bg_type not in _BACKGROUND_TYPES:
+            raise ValueError(_BACKGROUND_TYPES_MSG)
 
         return bg_type
 
 
-class UserProfileUpdate(BaseModel):
+class UserProfileUpdate(_SocialFields, _PageFields, _BasicInfoFields):
     """Complete profile update - all optional"""
-    first_name: Optional[str] = Field(None, max_length=50)
-    last_name: Optional[str] = Field(None, max_length=50)
-    display_name: Optional[str] = Field(None, max_length=100)
-    bio: Optional[str] = Field(None, max_length=500)
-    profile_image_url: Optional[str] = Field(None, max_length=500)
-    page_title: Optional[str] = Field(None, max_length=100)
-    page_description: Optional[str] = Field(None, max_length=500)
-    website: Optional[str] = Field(None, max_length=500)
-    twitter_username: Optional[str] = Field(None, max_length=100)
-    instagram_username: Optional[str] = Field(None, max_length=100)
-    linkedin_username: Optional[str] = Field(None, max_length=100)
+    # Tema alanlarının varsayılanı yok (kısmi güncelleme); Step 4'ün varsayılan atayan validator'ları uygulanmaz
     theme_color: Optional[str] = Field(None, max_length=20)
     background_type: Optional[str] = Field(None)
     background_value: Optional[str] = Field(None, max_length=500)
@@ -144,7 +163,8 @@ class UserRead(BaseModel):
     """User read model - session-detached safe"""
     id: int
     username: str
-    email: EmailStr
+    # Kayıtta EmailStr ile doğrulanmış değer veritabanından okunur; okumada email-validator çalıştırılmaz
+    email: str
     first_name: Optional[str] = None
     last_name: Optional[str] = None
     display_name: Optional[str] = None
@@ -162,42 +182,26 @@ class UserRead(BaseModel):
     profile_completed: bool = False
     onboarding_completed: bool = False
 
-    # DateTime fields as strings
+    # DateTime fields (JSON'da ISO-8601 string)
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
-    # Computed field - profile completion percentage
-    @computed_field
-    @property
-    def profile_completion_percentage(self) -> int:
-        """Calculate profile completion percentage without accessing relationships"""
-        total_fields = 7  # Reduced from 8 since we can't access links
-        completed_fields = 0
-
-        # Check required completion fields
-        if self.display_name: completed_fields += 1
-        if self.bio: completed_fields += 1
-        if self.profile_image_url: completed_fields += 1
-        if self.website: completed_fields += 1
-        if self.twitter_username or self.instagram_username or self.linkedin_username: completed_fields += 1
-        if self.page_title: completed_fields += 1
-        if self.page_description: completed_fields += 1
-        # Note: Link sayısını burada kontrol edemiyoruz çünkü relationship'e erişemiyoruz
-
-        return int((completed_fields / total_fields) * 100)
-
-    class Config:
-        from_attributes = True
-        # DateTime serialization için
-        json_encoders = {
-            datetime: lambda v: v.isoformat() if v else None
-        }
+    # users.profile_completion kolonundan okunur (yazma anında hesaplanır). User modelinin aynı adlı,
+    # linkleri de sayan property'si deferred has_any_link'e dokunduğu için ORM'den okunmaz.
+    profile_completion_percentage: int = Field(
+        0, validation_alias=AliasChoices("profile_completion", "profile_completion_percentage")
+    )
+
+    # datetime alanları JSON'a pydantic-core tarafından ISO-8601 olarak yazılır (Python callback yok)
+    model_config = ConfigDict(from_attributes=True)
 
 
 class OnboardingStatus(BaseModel):
     """Onboarding durumu"""
+    model_config = ConfigDict(defer_build=True)
+
     step: int = 1  # Hangi adımda
-    completed_steps: list[int] = []
+    completed_steps: tuple[int, ...] = ()  # Değişmez; router önceden kurulmuş tuple tablosundan verir
     profile_completion_percentage: int = 0
     next_step_title: Optional[str] = None
     can_skip: bool = True
@@ -1,4 +1,5 @@
 # settings.py
+from functools import lru_cache
 from typing import List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -9,10 +10,22 @@ class Settings(BaseSettings):
     )
 
     database_url: str
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    db_pool_recycle: int = 1800  # saniye
+    # PgBouncer (transaction mode) arkasında havuzlamayı PgBouncer'a bırak, asyncpg prepared statement cache'i kapanır
+    db_pgbouncer: bool = False
+    # Çok satırlı INSERT ... RETURNING'lerin tek statement'ta taşıyacağı en fazla satır sayısı
+    db_insertmanyvalues_page_size: int = 1000
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
 
+    # Argon2id parametreleri (hedef donanımda ~250 ms olacak şekilde ayarlanmalı)
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536  # KiB
+    argon2_parallelism: int = 1
+
     # Ortam değişkeni
     environment: str = "development"
 
@@ -20,4 +33,11 @@ class Settings(BaseSettings):
     allowed_hosts: Optional[List[str]] = None
     allowed_origins: Optional[List[str]] = None
 
-settings = Settings()
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """.env ve ortam değişkenleri süreç başına bir kez okunur; FastAPI'de Depends(get_settings) ile kullanılabilir"""
+    return Settings()
+
+
+settings = get_settings()
@@ -1,13 +1,17 @@
 from datetime import datetime, timezone
 
+# timezone.utc her çağrıda attribute lookup ile okunmaz
+_UTC = timezone.utc
+
 def utcnow():
     """Get current UTC time with timezone information"""
-    return datetime.now(timezone.utc)
+    return datetime.now(_UTC)
 
 def format_datetime(dt):
     """Format a datetime to ISO 8601 format with timezone"""
     if dt is None:
         return None
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    return dt.isoformat()
\ No newline at end of file
+    # Yaygın durum (zaten tz-aware, ör. utcnow()) yeni bir datetime oluşturmadan döner
+    if dt.tzinfo is not None:
+        return dt.isoformat()
+    return dt.replace(tzinfo=_UTC).isoformat()
\ No newline at end of file